@@ -0,0 +1,421 @@
+# -*- coding: utf-8 -*-
+"""
+Catalog persistence for Snowbreak Mod Manager.
+
+projects.json holds a full snapshot of the catalog. Every single-record change
+is appended to a journal file next to it, so an edit costs one small append
+instead of a rewrite of the whole library. The journal is folded back into the
+snapshot (write to a temp file, then rename over the original) once it grows
+past a threshold and when the application closes.
+
+The optional SQLite store keeps one row per mod with indexes on the category
+pair, path and name, so loading and single-record changes do not depend on the
+size of the library. It migrates the JSON catalog once on first use.
+
+Both stores also keep named profiles: the set of record ids that a profile
+enables. The JSON store journals them with the records and snapshots them to
+a ``.profiles`` file next to projects.json, so the snapshot stays a plain list.
+
+Every record carries a stable ``id`` (a UUID hex string) that both stores use
+as the record key. Records written by older versions, which were keyed by
+``path``, are given an id the first time they are loaded.
+"""
+
+import json
+import os
+import sqlite3
+import uuid
+from collections import defaultdict
+
+JOURNAL_SUFFIX = ".journal"
+PROFILES_SUFFIX = ".profiles"
+COMPACT_THRESHOLD = 500  # Journal entries before the snapshot is rewritten
+CATALOG_BACKENDS = ["json", "sqlite"]
+
+# Exceptions a store may raise from load() when its files are unreadable
+CATALOG_LOAD_ERRORS = (ValueError, TypeError, sqlite3.DatabaseError)
+
+
+def new_record_id():
+    """Return a fresh stable id for a catalog record."""
+    return uuid.uuid4().hex
+
+
+def assign_missing_ids(records):
+    """Give every record without an ``id`` a new one; return how many changed."""
+    assigned = 0
+    for record in records:
+        if not record.get("id"):
+            record["id"] = new_record_id()
+            assigned += 1
+    return assigned
+
+
+def record_key(record):
+    """Key used by the stores; pre-id records fall back to their path."""
+    return record.get("id") or record.get("path")
+
+
+def atomic_write_json(path, data, indent=None):
+    """Write ``data`` as JSON to ``path`` without ever leaving a torn file.
+
+    The content is written to a temporary file in the same directory, flushed
+    to disk and then renamed over ``path`` in a single step.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class JsonJournalStore:
+    """Snapshot + append-only journal storage for the mod catalog.
+
+    Records are plain dicts identified by their ``id``. The store keeps a
+    reference to every record it has loaded or been given, so callers can
+    mutate a record in place and then hand it back to :meth:`put`.
+    """
+
+    def __init__(self, snapshot_path, compact_threshold=COMPACT_THRESHOLD):
+        self.snapshot_path = snapshot_path
+        self.journal_path = snapshot_path + JOURNAL_SUFFIX
+        self.profiles_path = snapshot_path + PROFILES_SUFFIX
+        self.compact_threshold = compact_threshold
+        self._records = {}
+        self._profiles = {}  # profile name -> list of enabled record ids
+        self._journal_file = None
+        self._journal_entries = 0
+
+    # --- Loading ---
+    def load(self, read_only=False):
+        """Load the snapshot, replay the journal on top and return the records.
+
+        Args:
+            read_only: Leave the files as they are instead of folding the
+                journal and any newly assigned ids into a fresh snapshot.
+
+        Raises:
+            ValueError: The snapshot is not valid JSON.
+            TypeError: The snapshot does not contain a list of records.
+        """
+        self._records = {}
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+            if not isinstance(records, list):
+                raise TypeError("projects snapshot must be a list")
+            for record in records:
+                self._records[record_key(record)] = record
+        self._profiles = {}
+        if os.path.exists(self.profiles_path):
+            with open(self.profiles_path, "r", encoding="utf-8") as f:
+                profiles = json.load(f)
+            if not isinstance(profiles, dict):
+                raise TypeError("profiles snapshot must be an object")
+            self._profiles = profiles
+        needs_compact = os.path.exists(self.journal_path)
+        if needs_compact:
+            self._replay_journal()
+        if assign_missing_ids(self._records.values()):
+            self._records = {record["id"]: record for record in self._records.values()}
+            needs_compact = True
+        if needs_compact and not read_only:
+            # Start every session from a clean snapshot so a torn tail is never appended to.
+            self.compact()
+        return list(self._records.values())
+
+    def _replay_journal(self):
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn tail from a crash mid-append; everything before it is intact.
+                    break
+                self._apply(entry)
+
+    def _apply(self, entry):
+        op = entry.get("op")
+        if op == "put":
+            record = entry["record"]
+            key = record_key(record)
+            if key in self._records:
+                # Update in place so callers holding the old dict stay in sync.
+                self._records[key].clear()
+                self._records[key].update(record)
+            else:
+                self._records[key] = record
+        elif op == "delete":
+            self._records.pop(entry.get("key"), None)
+        elif op == "batch":
+            for sub_entry in entry.get("entries", []):
+                self._apply(sub_entry)
+        elif op == "profile_put":
+            self._profiles[entry["name"]] = entry["record_ids"]
+        elif op == "profile_delete":
+            self._profiles.pop(entry.get("name"), None)
+
+    def categories(self):
+        """Return a mapping of primary category -> set of secondary categories."""
+        categories = defaultdict(set)
+        for record in self._records.values():
+            if "category1" in record and "category2" in record:
+                categories[record["category1"]].add(record["category2"])
+        return categories
+
+    def profiles(self):
+        """Return a mapping of profile name -> list of enabled record ids."""
+        return {name: list(record_ids) for name, record_ids in self._profiles.items()}
+
+    # --- Mutations ---
+    def put(self, record):
+        """Insert or update a single record."""
+        self._records[record["id"]] = record
+        self._append({"op": "put", "record": record})
+
+    def put_many(self, records, deleted=()):
+        """Insert or update ``records`` and remove ``deleted`` as one all-or-nothing journal entry."""
+        for record in records:
+            self._records[record["id"]] = record
+        for record in deleted:
+            self._records.pop(record["id"], None)
+        entries = [{"op": "put", "record": r} for r in records]
+        entries.extend({"op": "delete", "key": r["id"]} for r in deleted)
+        self._append({"op": "batch", "entries": entries})
+
+    def delete(self, record):
+        """Remove a single record."""
+        key = record["id"]
+        self._records.pop(key, None)
+        self._append({"op": "delete", "key": key})
+
+    def put_profile(self, name, record_ids):
+        """Create or replace the profile ``name``."""
+        self._profiles[name] = list(record_ids)
+        self._append({"op": "profile_put", "name": name, "record_ids": self._profiles[name]})
+
+    def delete_profile(self, name):
+        self._profiles.pop(name, None)
+        self._append({"op": "profile_delete", "name": name})
+
+    def _append(self, entry):
+        if self._journal_file is None:
+            self._journal_file = open(self.journal_path, "a", encoding="utf-8")
+        self._journal_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._journal_file.flush()
+        os.fsync(self._journal_file.fileno())
+        self._journal_entries += 1
+        if self._journal_entries >= self.compact_threshold:
+            self.compact()
+
+    # --- Compaction ---
+    def compact(self):
+        """Fold the journal into a fresh snapshot and truncate it."""
+        atomic_write_json(self.snapshot_path, list(self._records.values()), indent=2)
+        if self._profiles or os.path.exists(self.profiles_path):
+            atomic_write_json(self.profiles_path, self._profiles, indent=2)
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._journal_entries = 0
+
+    def close(self):
+        """Compact pending changes and release the journal file."""
+        if self._journal_entries or self._journal_file is not None:
+            self.compact()
+
+
+class SqliteCatalogStore:
+    """SQLite storage for the mod catalog with one row per record.
+
+    The indexed fields are stored in their own columns and the complete record
+    is kept as JSON in ``data``, so new record fields need no schema change.
+    Schema changes after the first release are applied by :meth:`_upgrade`
+    and tracked in ``PRAGMA user_version``.
+    """
+
+    SCHEMA_VERSION = 3
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS projects (
+            id INTEGER PRIMARY KEY,
+            path TEXT NOT NULL,
+            name TEXT,
+            category1 TEXT,
+            category2 TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_projects_path ON projects(path);
+        CREATE INDEX IF NOT EXISTS idx_projects_category ON projects(category1, category2);
+        CREATE INDEX IF NOT EXISTS idx_projects_name ON projects(name);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, db_path, legacy_snapshot_path=None):
+        self.db_path = db_path
+        self.legacy_snapshot_path = legacy_snapshot_path
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            # Autocommit mode; multi-statement changes open their own transaction.
+            self._conn = sqlite3.connect(self.db_path, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+            self._upgrade(self._conn)
+        return self._conn
+
+    def _upgrade(self, conn):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= self.SCHEMA_VERSION:
+            return
+        conn.execute("BEGIN")
+        try:
+            if version < 2:
+                # Version 2 keys rows by the stable record id instead of the path.
+                columns = [row[1] for row in conn.execute("PRAGMA table_info(projects)")]
+                if "record_id" not in columns:
+                    conn.execute("ALTER TABLE projects ADD COLUMN record_id TEXT")
+                rows = conn.execute("SELECT id, data FROM projects").fetchall()
+                for row_id, data in rows:
+                    record = json.loads(data)
+                    assign_missing_ids([record])
+                    conn.execute(
+                        "UPDATE projects SET record_id = ?, data = ? WHERE id = ?",
+                        (record["id"], json.dumps(record, ensure_ascii=False), row_id),
+                    )
+                conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_projects_record_id "
+                             "ON projects(record_id)")
+                # Rows are now keyed by record id, so the path index no longer needs to be unique.
+                conn.execute("DROP INDEX IF EXISTS idx_projects_path")
+                conn.execute("CREATE INDEX idx_projects_path ON projects(path)")
+            if version < 3:
+                conn.execute("CREATE TABLE IF NOT EXISTS profiles ("
+                             "name TEXT PRIMARY KEY, record_ids TEXT NOT NULL)")
+            conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # --- Loading ---
+    def load(self):
+        """Return all records in insertion order, migrating projects.json once."""
+        conn = self._connect()
+        self._migrate_from_json(conn)
+        rows = conn.execute("SELECT data FROM projects ORDER BY id").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def _migrate_from_json(self, conn):
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+            return
+        records, profiles = [], {}
+        if self.legacy_snapshot_path and os.path.exists(self.legacy_snapshot_path):
+            legacy_store = JsonJournalStore(self.legacy_snapshot_path)
+            records = legacy_store.load(read_only=True)
+            profiles = legacy_store.profiles()
+        assign_missing_ids(records)
+        # The JSON files are left untouched as a backup of the pre-migration catalog.
+        conn.execute("BEGIN")
+        try:
+            for record in records:
+                self._upsert(conn, record)
+            for name, record_ids in profiles.items():
+                self._upsert_profile(conn, name, record_ids)
+            conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', '1')")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def categories(self):
+        """Return a mapping of primary category -> set of secondary categories."""
+        categories = defaultdict(set)
+        rows = self._connect().execute(
+            "SELECT DISTINCT category1, category2 FROM projects "
+            "WHERE category1 IS NOT NULL AND category2 IS NOT NULL"
+        )
+        for cat1, cat2 in rows:
+            categories[cat1].add(cat2)
+        return categories
+
+    def profiles(self):
+        """Return a mapping of profile name -> list of enabled record ids."""
+        rows = self._connect().execute("SELECT name, record_ids FROM profiles ORDER BY name")
+        return {name: json.loads(record_ids) for name, record_ids in rows}
+
+    # --- Mutations ---
+    @staticmethod
+    def _upsert_profile(conn, name, record_ids):
+        conn.execute(
+            "INSERT INTO profiles (name, record_ids) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET record_ids = excluded.record_ids",
+            (name, json.dumps(list(record_ids))),
+        )
+
+    def put_profile(self, name, record_ids):
+        """Create or replace the profile ``name``."""
+        self._upsert_profile(self._connect(), name, record_ids)
+
+    def delete_profile(self, name):
+        self._connect().execute("DELETE FROM profiles WHERE name = ?", (name,))
+
+    @staticmethod
+    def _upsert(conn, record):
+        conn.execute(
+            "INSERT INTO projects (record_id, path, name, category1, category2, data) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(record_id) DO UPDATE SET path = excluded.path, "
+            "name = excluded.name, category1 = excluded.category1, "
+            "category2 = excluded.category2, data = excluded.data",
+            (record["id"], record.get("path"), record.get("name"), record.get("category1"),
+             record.get("category2"), json.dumps(record, ensure_ascii=False)),
+        )
+
+    def put(self, record):
+        """Insert or update a single record."""
+        self._upsert(self._connect(), record)
+
+    def put_many(self, records, deleted=()):
+        """Insert or update ``records`` and remove ``deleted`` in a single transaction."""
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            for record in records:
+                self._upsert(conn, record)
+            for record in deleted:
+                conn.execute("DELETE FROM projects WHERE record_id = ?", (record["id"],))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, record):
+        """Remove a single record."""
+        self._connect().execute("DELETE FROM projects WHERE record_id = ?", (record["id"],))
+
+    # --- Maintenance ---
+    def compact(self):
+        """Checkpoint the write-ahead log into the main database file."""
+        self._connect().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        """Checkpoint and close the database connection."""
+        if self._conn is not None:
+            self.compact()
+            self._conn.close()
+            self._conn = None
+
+
+def open_store(backend, snapshot_path, db_path):
+    """Create the catalog store selected by the ``catalog_backend`` setting."""
+    if backend == "sqlite":
+        return SqliteCatalogStore(db_path, legacy_snapshot_path=snapshot_path)
+    return JsonJournalStore(snapshot_path)
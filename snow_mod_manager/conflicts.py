@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Asset conflicts between enabled mods.
+
+Two enabled mods conflict when their pak/utoc indexes name the same asset;
+the game then loads only one of them, depending on load order. The index
+maps every asset to the enabled mods containing it and keeps, per mod, the
+number of its assets that another enabled mod also contains. Enabling or
+disabling a mod only touches that mod's own assets, so an update costs time
+proportional to the mod's asset count, not to the size of the library.
+
+Assets are compared case-insensitively and without their extension, since a
+``.uasset`` and its ``.uexp``/``.ubulk`` parts make up one asset.
+"""
+
+import posixpath
+
+
+def asset_key(path):
+    return posixpath.splitext(path)[0].casefold()
+
+
+class ConflictIndex:
+    """Inverted index from asset to the enabled mods that override it; not thread-safe."""
+
+    def __init__(self):
+        self._mods_by_asset = {}  # asset key -> set of record ids
+        self._assets = {}  # record id -> set of asset keys
+        self._counts = {}  # record id -> number of its assets shared with another mod
+
+    def build(self, mods):
+        """Index ``mods``, an iterable of ``(record id, asset paths)`` of the enabled mods."""
+        self._mods_by_asset, self._assets, self._counts = {}, {}, {}
+        for record_id, assets in mods:
+            self.set_assets(record_id, assets)
+
+    def set_assets(self, record_id, assets):
+        """Enter an enabled mod with ``assets``; an empty list takes it out.
+
+        Returns:
+            The ids of the mods whose conflict count changed.
+        """
+        affected = self.remove(record_id)
+        keys = {asset_key(path) for path in assets or ()}
+        if not keys:
+            return affected
+        self._assets[record_id] = keys
+        count = 0
+        for key in keys:
+            ids = self._mods_by_asset.get(key)
+            if ids is None:
+                self._mods_by_asset[key] = {record_id}
+                continue
+            if len(ids) == 1:
+                # The asset's only other mod now has one more conflict.
+                other = next(iter(ids))
+                self._counts[other] = self._counts.get(other, 0) + 1
+                affected.add(other)
+            ids.add(record_id)
+            count += 1
+        if count:
+            self._counts[record_id] = count
+            affected.add(record_id)
+        return affected
+
+    def remove(self, record_id):
+        """Take a disabled or deleted mod out; returns the ids whose conflict count changed."""
+        affected = set()
+        keys = self._assets.pop(record_id, None)
+        if keys is None:
+            return affected
+        if self._counts.pop(record_id, 0):
+            affected.add(record_id)
+        for key in keys:
+            ids = self._mods_by_asset[key]
+            ids.discard(record_id)
+            if len(ids) == 1:
+                other = next(iter(ids))
+                self._counts[other] -= 1
+                if not self._counts[other]:
+                    del self._counts[other]
+                affected.add(other)
+            elif not ids:
+                del self._mods_by_asset[key]
+        return affected
+
+    # --- Lookups ---
+    def conflict_count(self, record_id):
+        """Return how many assets of a mod another enabled mod also overrides."""
+        return self._counts.get(record_id, 0)
+
+    def conflicts_of(self, record_id):
+        """Return ``{other record id: sorted shared asset keys}`` for an enabled mod."""
+        if not self._counts.get(record_id):
+            return {}
+        conflicts = {}
+        for key in self._assets[record_id]:
+            ids = self._mods_by_asset[key]
+            if len(ids) > 1:
+                for other in ids:
+                    if other != record_id:
+                        conflicts.setdefault(other, []).append(key)
+        return {other: sorted(keys) for other, keys in conflicts.items()}
@@ -0,0 +1,469 @@
+# -*- coding: utf-8 -*-
+"""
+File operations used when importing mods into the storage path.
+
+Everything here is plain Python and safe to call from worker threads; progress
+is reported through callbacks and cancellation through a threading.Event.
+
+Besides a plain copy, a file can be imported by moving it, hard-linking it or
+cloning it (reflink / copy-on-write, e.g. FICLONE on Btrfs and XFS). The fast
+modes only work when source and destination share a filesystem; otherwise
+:func:`import_file` falls back to a chunked copy.
+
+Batches of enable/disable renames are all-or-nothing and can be recorded in
+a write-ahead :class:`RenameJournal`, so a batch interrupted by a crash is
+rolled back or finished on the next start.
+
+Mods packed as .zip or tar archives are read member by member straight into
+the storage path through a bounded buffer, without unpacking the archive to a
+temporary directory first.
+"""
+
+import errno
+import json
+import os
+import posixpath
+import shutil
+import sys
+import tarfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from catalog import atomic_write_json
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+DISABLED_EXT = ".disabled"  # Suffix that hides a mod file from the game
+COPY_CHUNK_SIZE = 4 * 1024 * 1024  # Bytes read and written per step
+RENAME_WORKERS = 8  # Threads used for large batches of enable/disable renames
+TRASH_DIR = ".trash"  # Hidden folder holding deleted mods until their deletion can no longer be undone
+PARTIAL_SUFFIX = ".part"
+FICLONE = 0x40049409  # Linux ioctl: share all extents of one file with another
+
+IMPORT_MODE_COPY = "copy"
+IMPORT_MODE_MOVE = "move"
+IMPORT_MODE_HARDLINK = "hardlink"
+IMPORT_MODE_REFLINK = "reflink"
+IMPORT_MODES = [IMPORT_MODE_COPY, IMPORT_MODE_MOVE, IMPORT_MODE_HARDLINK, IMPORT_MODE_REFLINK]
+
+# A mod is a .pak, optionally with IoStore .utoc/.ucas files of the same name
+MOD_SET_EXTENSIONS = (".pak", ".utoc", ".ucas")
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+# Raised by zipfile/tarfile for damaged, encrypted or unsupported archives
+ARCHIVE_ERRORS = (OSError, zipfile.BadZipFile, tarfile.TarError, RuntimeError, NotImplementedError)
+
+# errno values meaning "this fast path is not available here", as opposed to a real I/O error
+_FAST_PATH_UNSUPPORTED = {
+    errno.EXDEV, errno.EPERM, errno.EACCES, errno.EINVAL, errno.ENOTTY,
+    errno.EOPNOTSUPP, getattr(errno, "ENOTSUP", errno.EOPNOTSUPP), errno.EMLINK,
+}
+
+
+class ImportCancelled(Exception):
+    """Raised when an import is cancelled before it completes."""
+
+
+def _stream_to_file(fsrc, dst, total, progress, cancel_event, chunk_size, what):
+    """Copy an open binary stream into ``dst`` via a .part file."""
+    partial_path = dst + PARTIAL_SUFFIX
+    done = 0
+    try:
+        with open(partial_path, "wb") as fdst:
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise ImportCancelled(what)
+                chunk = fsrc.read(chunk_size)
+                if not chunk:
+                    break
+                fdst.write(chunk)
+                done += len(chunk)
+                if progress is not None:
+                    progress(done, total)
+        os.replace(partial_path, dst)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    return done
+
+
+def copy_file_chunked(src, dst, progress=None, cancel_event=None, chunk_size=COPY_CHUNK_SIZE):
+    """Copy ``src`` to ``dst`` in fixed-size chunks.
+
+    The data is written to ``dst + PARTIAL_SUFFIX`` and renamed into place only
+    once complete, so an interrupted copy never looks like a finished mod.
+
+    Args:
+        src: Source file path.
+        dst: Destination file path.
+        progress: Optional callable ``progress(bytes_done, bytes_total)``.
+        cancel_event: Optional threading.Event; when set the copy stops.
+        chunk_size: Number of bytes per read/write.
+
+    Raises:
+        ImportCancelled: ``cancel_event`` was set before the copy finished.
+        OSError: Reading or writing failed.
+    """
+    total = os.path.getsize(src)
+    with open(src, "rb") as fsrc:
+        _stream_to_file(fsrc, dst, total, progress, cancel_event, chunk_size, src)
+    return total
+
+
+def _same_device(src, dst_dir):
+    try:
+        return os.stat(src).st_dev == os.stat(dst_dir).st_dev
+    except OSError:
+        return False
+
+
+def reflink_file(src, dst):
+    """Clone ``src`` to ``dst`` sharing the same data blocks (copy-on-write).
+
+    Raises:
+        OSError: The platform or filesystem does not support cloning.
+    """
+    if fcntl is None or not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "reflink is not supported on this platform", src)
+    partial_path = dst + PARTIAL_SUFFIX
+    try:
+        with open(src, "rb") as fsrc, open(partial_path, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        os.replace(partial_path, dst)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+
+
+def import_file(src, dst, mode=IMPORT_MODE_COPY, progress=None, cancel_event=None):
+    """Place ``src`` at ``dst`` using ``mode``, falling back to a chunked copy.
+
+    ``move`` renames the file when both paths are on the same volume and
+    otherwise copies it and removes the source afterwards; if the source
+    cannot be removed, the move is reported as a copy. ``hardlink`` and
+    ``reflink`` leave the source in place.
+
+    Returns:
+        The mode that was actually used.
+
+    Raises:
+        ImportCancelled: ``cancel_event`` was set during a chunked copy.
+        OSError: The file could not be placed at ``dst``.
+    """
+    total = os.path.getsize(src)
+    dst_dir = os.path.dirname(dst)
+    if mode in (IMPORT_MODE_MOVE, IMPORT_MODE_HARDLINK, IMPORT_MODE_REFLINK) \
+            and _same_device(src, dst_dir):
+        try:
+            if mode == IMPORT_MODE_MOVE:
+                os.replace(src, dst)
+            elif mode == IMPORT_MODE_HARDLINK:
+                os.link(src, dst)
+            else:
+                reflink_file(src, dst)
+        except OSError as e:
+            if e.errno not in _FAST_PATH_UNSUPPORTED:
+                raise
+        else:
+            if progress is not None:
+                progress(total, total)
+            return mode
+    copy_file_chunked(src, dst, progress=progress, cancel_event=cancel_event)
+    if mode == IMPORT_MODE_MOVE:
+        try:
+            os.remove(src)
+        except OSError:
+            # The copy is complete; a locked source only means it stays behind.
+            return IMPORT_MODE_COPY
+        return IMPORT_MODE_MOVE
+    return IMPORT_MODE_COPY
+
+
+def undo_import(src, dst, used_mode):
+    """Best-effort reversal of :func:`import_file` for a partially imported set."""
+    try:
+        if used_mode == IMPORT_MODE_MOVE:
+            shutil.move(dst, src)
+        elif os.path.exists(dst):
+            os.remove(dst)
+    except OSError:
+        pass
+
+
+# --- Mod file sets ---
+
+class RenameJournal:
+    """Write-ahead record of one batch of renames.
+
+    The planned ``(src, dst)`` pairs are written and flushed to disk before
+    the first rename and the file is removed once the batch has completed or
+    been rolled back. A journal still present at startup therefore belongs to
+    an interrupted batch; whether each pair was applied can be read off the
+    file system, so :meth:`recover` can undo or finish it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def pending(self):
+        """Return the pairs of an interrupted batch, or None."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return [tuple(pair) for pair in json.load(f)["renames"]]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            return []  # Torn before the batch began; nothing was renamed
+
+    def begin(self, pairs):
+        atomic_write_json(self.path, {"renames": [list(pair) for pair in pairs]})
+
+    def commit(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def recover(self, resume=False):
+        """Roll back (or with ``resume`` finish) an interrupted batch.
+
+        Returns:
+            The number of files renamed during recovery.
+        """
+        pairs = self.pending() or []
+        renamed = 0
+        if resume:
+            for src, dst in pairs:
+                if os.path.exists(src) and not os.path.exists(dst):
+                    os.makedirs(os.path.dirname(dst), exist_ok=True)
+                    os.rename(src, dst)
+                    renamed += 1
+        else:
+            for src, dst in reversed(pairs):
+                if os.path.exists(dst) and not os.path.exists(src):
+                    os.rename(dst, src)
+                    renamed += 1
+        self.commit()
+        return renamed
+
+
+def rename_mod_sets(jobs, cancel_event=None, max_workers=1, journal=None):
+    """Rename the files of several mods as one all-or-nothing operation.
+
+    If a rename fails or the batch is cancelled, every rename already made is
+    reversed before the exception propagates. With ``max_workers`` above one,
+    different mods are renamed in parallel; the files of one mod are always
+    renamed in order by the same thread.
+
+    Args:
+        jobs: One list of ``(src, dst)`` pairs per mod. The first pair is the
+            primary file and must exist; the others are optional companions.
+        cancel_event: Optional threading.Event; when set the batch is undone.
+        max_workers: Number of threads renaming at the same time.
+        journal: Optional RenameJournal the batch is recorded in while it runs.
+
+    Returns:
+        The ``(src, dst)`` pairs that were renamed, in the order they happened.
+
+    Raises:
+        ImportCancelled: ``cancel_event`` was set before the batch finished.
+        OSError: A rename failed.
+    """
+    done = []  # (src, dst) of every completed rename, across all threads
+    lock = threading.Lock()
+    failed = threading.Event()
+
+    def rename_set(pairs):
+        if failed.is_set():
+            return
+        try:
+            if cancel_event is not None and cancel_event.is_set():
+                raise ImportCancelled(pairs[0][0])
+            for i, (src, dst) in enumerate(pairs):
+                try:
+                    os.rename(src, dst)
+                except FileNotFoundError:
+                    if i == 0:
+                        raise
+                    continue
+                with lock:
+                    done.append((src, dst))
+        except BaseException:
+            failed.set()  # Lets the remaining queued mods return immediately
+            raise
+
+    if journal is not None:
+        journal.begin([pair for pairs in jobs for pair in pairs])
+    try:
+        if max_workers > 1 and len(jobs) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                for future in [pool.submit(rename_set, pairs) for pairs in jobs]:
+                    future.result()
+        else:
+            for pairs in jobs:
+                rename_set(pairs)
+    except BaseException:
+        rolled_back = True
+        for src, dst in reversed(done):
+            try:
+                os.rename(dst, src)
+            except OSError:
+                rolled_back = False
+        if journal is not None and rolled_back:
+            journal.commit()  # Otherwise the next start retries the rollback
+        raise
+    if journal is not None:
+        journal.commit()
+    return done
+
+
+def trash_pairs(path, trash_dir):
+    """Return ``(src, dst)`` renames moving the existing files of a mod into ``trash_dir``.
+
+    Trashed files always carry DISABLED_EXT, so the game never loads them.
+    """
+    pairs = []
+    for enabled_path in mod_file_paths(path.replace(DISABLED_EXT, '')):
+        for src in (enabled_path, enabled_path + DISABLED_EXT):
+            if os.path.exists(src):
+                name = os.path.basename(enabled_path) + DISABLED_EXT
+                pairs.append((src, os.path.join(trash_dir, name)))
+    return pairs
+
+
+def toggle_pairs(path, enable):
+    """Return the ``(src, dst)`` renames that enable or disable the mod at ``path``."""
+    pairs = []
+    for enabled_path in mod_file_paths(path.replace(DISABLED_EXT, '')):
+        disabled_path = enabled_path + DISABLED_EXT
+        pairs.append((disabled_path, enabled_path) if enable else (enabled_path, disabled_path))
+    return pairs
+
+
+def existing_mod_file(path):
+    """Return whichever of the enabled or disabled variant of ``path`` exists, or None."""
+    enabled_path = path.replace(DISABLED_EXT, '')
+    for candidate in (enabled_path, enabled_path + DISABLED_EXT):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def companion_paths(path):
+    """Return the IoStore files that belong to the .pak at ``path``."""
+    base, ext = os.path.splitext(path)
+    if ext.lower() != ".pak":
+        return []
+    return [base + companion_ext for companion_ext in MOD_SET_EXTENSIONS[1:]]
+
+
+def mod_file_paths(path):
+    """Return the primary file of a mod followed by its companion files."""
+    return [path] + companion_paths(path)
+
+
+def group_mod_files(paths):
+    """Group files sharing a directory and name stem into mod sets.
+
+    Returns:
+        A list of file lists. Within a set the .pak (if any) comes first, so
+        ``files[0]`` is the path the catalog records for the mod.
+    """
+    order = {ext: i for i, ext in enumerate(MOD_SET_EXTENSIONS)}
+    groups = {}
+    for path in paths:
+        base, ext = os.path.splitext(path)
+        key = base if ext.lower() in order else path
+        groups.setdefault(key, []).append(path)
+    return [
+        sorted(files, key=lambda p: order.get(os.path.splitext(p)[1].lower(), len(order)))
+        for files in groups.values()
+    ]
+
+
+def find_mod_sets(root):
+    """Recursively collect mod sets below ``root``.
+
+    Returns:
+        A list of ``(relative_dir_parts, files)`` tuples, where
+        ``relative_dir_parts`` are the folder names between ``root`` and the set.
+    """
+    mod_sets = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        paths = [
+            os.path.join(dirpath, name) for name in sorted(filenames)
+            if os.path.splitext(name)[1].lower() in MOD_SET_EXTENSIONS
+        ]
+        if not paths:
+            continue
+        rel_dir = os.path.relpath(dirpath, root)
+        rel_parts = () if rel_dir == os.curdir else tuple(rel_dir.split(os.sep))
+        mod_sets.extend((rel_parts, files) for files in group_mod_files(paths))
+    return mod_sets
+
+
+# --- Archives ---
+
+def list_archive_members(archive_path):
+    """Return ``(member_name, size)`` for every regular file in an archive.
+
+    Raises:
+        One of ARCHIVE_ERRORS: The archive is unreadable.
+    """
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as zf:
+            return [(info.filename, info.file_size) for info in zf.infolist() if not info.is_dir()]
+    with tarfile.open(archive_path, "r:*") as tf:
+        return [(member.name, member.size) for member in tf.getmembers() if member.isfile()]
+
+
+def member_basename(member_name):
+    """File name of an archive member; archive paths always use '/'."""
+    return posixpath.basename(member_name.replace("\\", "/"))
+
+
+def extract_members(archive_path, pairs, progress=None, cancel_event=None,
+                    chunk_size=COPY_CHUNK_SIZE):
+    """Stream selected archive members to their destinations.
+
+    Each member is decompressed through a ``chunk_size`` buffer, so memory use
+    does not depend on the size of the archive or the member.
+
+    Args:
+        archive_path: Path of the .zip or tar archive.
+        pairs: ``(member_name, destination_path)`` tuples.
+        progress: Optional callable ``progress(bytes_done, bytes_total)`` over all pairs.
+        cancel_event: Optional threading.Event; when set extraction stops.
+
+    Members that were written completely before an error are left in place;
+    the caller decides whether to remove them.
+
+    Raises:
+        ImportCancelled: ``cancel_event`` was set before extraction finished.
+        One of ARCHIVE_ERRORS: Reading or writing failed.
+    """
+    if zipfile.is_zipfile(archive_path):
+        archive = zipfile.ZipFile(archive_path)
+        sizes = {info.filename: info.file_size for info in archive.infolist()}
+        open_member = archive.open
+    else:
+        archive = tarfile.open(archive_path, "r:*")
+        sizes = {member.name: member.size for member in archive.getmembers()}
+        open_member = archive.extractfile
+    total = sum(sizes[member_name] for member_name, _ in pairs)
+    offset = 0
+    with archive:
+        for member_name, dst in pairs:
+            report = None
+            if progress is not None:
+                report = lambda done, _total, offset=offset: progress(offset + done, total)
+            with open_member(member_name) as fsrc:
+                _stream_to_file(fsrc, dst, sizes[member_name], report, cancel_event,
+                                chunk_size, member_name)
+            offset += sizes[member_name]
@@ -0,0 +1,380 @@
+# -*- coding: utf-8 -*-
+"""
+Content hashing and duplicate detection for the mod library.
+
+Files are hashed with BLAKE2b over memory-mapped slices. Digests are kept in
+a persistent cache keyed by the file's stat signature (size, mtime_ns, inode),
+so a file is only read again after it changed. hashlib releases the GIL while
+hashing, so the duplicate scan hashes several files in parallel on a thread
+pool.
+
+The duplicate index only hashes a mod when another mod's files add up to exactly
+the same size, so importing a mod with a unique size costs a few stat calls and
+no reads.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from catalog import atomic_write_json
+from file_ops import DISABLED_EXT, ImportCancelled, companion_paths, existing_mod_file
+
+HASH_CHUNK_SIZE = 16 * 1024 * 1024  # Bytes fed to the hasher per step
+DIGEST_SIZE = 32
+HASH_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def hash_file(path, cancel_event=None, chunk_size=HASH_CHUNK_SIZE):
+    """Return the hex BLAKE2b digest of the file at ``path``.
+
+    The file is memory-mapped and hashed in ``chunk_size`` slices; if it cannot
+    be mapped (empty files, some network shares) it is read through a buffer
+    of the same size instead.
+
+    Raises:
+        ImportCancelled: ``cancel_event`` was set while hashing.
+        OSError: The file could not be read.
+    """
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            mapped = None
+        if mapped is not None:
+            with mapped, memoryview(mapped) as view:
+                for offset in range(0, len(view), chunk_size):
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise ImportCancelled(path)
+                    digest.update(view[offset:offset + chunk_size])
+        else:
+            buffer = bytearray(chunk_size)
+            with memoryview(buffer) as view:
+                while True:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise ImportCancelled(path)
+                    read = f.readinto(buffer)
+                    if not read:
+                        break
+                    digest.update(view[:read])
+    return digest.hexdigest()
+
+
+class HashCache:
+    """Persistent digest cache keyed by path and stat signature; thread-safe.
+
+    Paths are stored without the ``.disabled`` suffix, because enabling or
+    disabling a mod renames its file without touching its content.
+    """
+
+    VERSION = 1
+
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._entries = {}  # normalized path -> [size, mtime_ns, inode, digest]
+        self._dirty = False
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.abspath(path.replace(DISABLED_EXT, '')))
+
+    def load(self):
+        """Read the cache file; a missing or damaged file starts an empty cache."""
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == self.VERSION:
+            with self._lock:
+                self._entries = data.get("entries", {})
+
+    def save(self, keep_paths=None):
+        """Write the cache if it changed.
+
+        Args:
+            keep_paths: Optional iterable of paths still in use; entries for
+                other paths are dropped so the file does not grow forever.
+        """
+        with self._lock:
+            if keep_paths is not None:
+                keep = {self._key(path) for path in keep_paths}
+                stale = [key for key in self._entries if key not in keep]
+                for key in stale:
+                    del self._entries[key]
+                self._dirty = self._dirty or bool(stale)
+            if not self._dirty:
+                return
+            data = {"version": self.VERSION, "entries": dict(self._entries)}
+            self._dirty = False
+        atomic_write_json(self.cache_path, data)
+
+    def cached_digest(self, path, st):
+        """Return the cached digest if ``st`` still matches, without any I/O."""
+        with self._lock:
+            entry = self._entries.get(self._key(path))
+        if entry and entry[:3] == [st.st_size, st.st_mtime_ns, st.st_ino]:
+            return entry[3]
+        return None
+
+    def digest(self, path, cancel_event=None):
+        """Return the digest of ``path``, hashing it only if its stat changed.
+
+        Raises:
+            ImportCancelled: ``cancel_event`` was set while hashing.
+            OSError: The file could not be read.
+        """
+        st = os.stat(path)
+        cached = self.cached_digest(path, st)
+        if cached is not None:
+            return cached
+        digest = hash_file(path, cancel_event)
+        with self._lock:
+            self._entries[self._key(path)] = [st.st_size, st.st_mtime_ns, st.st_ino, digest]
+            self._dirty = True
+        return digest
+
+
+class DuplicateIndex:
+    """Size and content-hash index over the catalog, safe to use from worker threads.
+
+    A mod is its whole set of files: the .pak plus any .utoc/.ucas next to it.
+    IoStore mods often ship byte-identical stub .pak files, so two mods only
+    count as duplicates when every file of the set matches. Mods are bucketed
+    by the combined size of their set, and the set digest is a digest over the
+    digests of its members; a mod without companions uses its file's digest.
+
+    Each entry remembers the catalog path plus the last known ``size``,
+    ``mtime_ns`` and ``content_hash`` of the primary file. Entries start from
+    the values cached on the catalog records and are filled in on demand;
+    callers copy the updated values back into their records via
+    :meth:`take_changed`. Digests come from ``hash_cache`` when one is given.
+    """
+
+    def __init__(self, hash_cache=None):
+        self.hash_cache = hash_cache
+        self._lock = threading.Lock()
+        # record id -> {"path", "size", "mtime_ns", "content_hash",
+        #               "set_size", "set_stamp", "set_hash"}
+        self._entries = {}
+        self._by_size = {}  # combined set size -> set of record ids
+        self._changed = set()
+
+    # --- Maintenance ---
+    def add(self, record_id, path, size=None, mtime_ns=None, content_hash=None):
+        with self._lock:
+            self._remove_locked(record_id)
+            # The set size is only known once the files were stat-ed.
+            self._entries[record_id] = {
+                "path": path, "size": size, "mtime_ns": mtime_ns, "content_hash": content_hash,
+                "set_size": None, "set_stamp": None, "set_hash": None,
+            }
+
+    def add_record(self, record):
+        self.add(record["id"], record.get("path", ""), record.get("size"),
+                 record.get("mtime_ns"), record.get("content_hash"))
+
+    def remove(self, record_id):
+        with self._lock:
+            self._remove_locked(record_id)
+
+    def _remove_locked(self, record_id):
+        entry = self._entries.pop(record_id, None)
+        if entry is not None and entry["set_size"] is not None:
+            ids = self._by_size.get(entry["set_size"])
+            if ids:
+                ids.discard(record_id)
+                if not ids:
+                    del self._by_size[entry["set_size"]]
+        self._changed.discard(record_id)
+
+    def _put_locked(self, record_id, entry):
+        self._remove_locked(record_id)
+        self._entries[record_id] = entry
+        if entry["set_size"] is not None:
+            self._by_size.setdefault(entry["set_size"], set()).add(record_id)
+
+    def take_changed(self):
+        """Return ``{record_id: entry}`` for entries updated since the last call."""
+        with self._lock:
+            changed = {rid: dict(self._entries[rid]) for rid in self._changed if rid in self._entries}
+            self._changed = set()
+            return changed
+
+    def commit_reservation(self, record_id, dest_path):
+        """Point a reservation from :meth:`check_and_reserve` at its imported files."""
+        try:
+            stats = _stat_files(_set_files(dest_path))
+        except OSError:
+            return
+        if not stats:
+            return
+        with self._lock:
+            entry = self._entries.get(record_id)
+            if entry is None:
+                return
+            st = stats[0][1]
+            # The content did not change, so the digests carry over to the copy.
+            self._put_locked(record_id, dict(
+                entry, path=dest_path, size=st.st_size, mtime_ns=st.st_mtime_ns,
+                set_size=_set_size(stats), set_stamp=_set_stamp(stats)))
+            self._changed.add(record_id)
+
+    # --- Lookups ---
+    def _refresh(self, record_id, cancel_event=None, need_hash=False):
+        """Re-stat an entry's files and hash them if required; returns the entry or None."""
+        with self._lock:
+            entry = self._entries.get(record_id)
+            if entry is None:
+                return None
+            path, old = entry["path"], dict(entry)
+        try:
+            stats = _stat_files(_set_files(path))
+        except OSError:
+            return None
+        if not stats:
+            return None
+        file_path, st = stats[0]
+        content_hash = old["content_hash"]
+        if st.st_size != old["size"] or st.st_mtime_ns != old["mtime_ns"]:
+            content_hash = None
+        if content_hash is None and self.hash_cache is not None:
+            content_hash = self.hash_cache.cached_digest(file_path, st)
+        set_stamp = _set_stamp(stats)
+        set_hash = old["set_hash"] if set_stamp == old["set_stamp"] else None
+        try:
+            if need_hash and content_hash is None:
+                content_hash = self._hash(file_path, cancel_event)
+            if len(stats) == 1:
+                set_hash = content_hash
+            elif need_hash and set_hash is None:
+                set_hash = self._set_digest([f for f, _ in stats], content_hash, cancel_event)
+        except OSError:
+            return None
+        updated = {"path": path, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                   "content_hash": content_hash, "set_size": _set_size(stats),
+                   "set_stamp": set_stamp, "set_hash": set_hash}
+        with self._lock:
+            current = self._entries.get(record_id)
+            if current is None or current["path"] != path:
+                # Removed or re-pointed by another thread meanwhile; leave it alone.
+                return updated
+            if updated != current:
+                self._put_locked(record_id, updated)
+                if any(updated[key] != current[key] for key in ("size", "mtime_ns", "content_hash")):
+                    self._changed.add(record_id)
+        return updated
+
+    def _hash(self, path, cancel_event=None):
+        if self.hash_cache is not None:
+            return self.hash_cache.digest(path, cancel_event)
+        return hash_file(path, cancel_event)
+
+    def _set_digest(self, paths, primary_digest, cancel_event=None):
+        """Digest a mod set from the digests of its files, tagged by extension."""
+        digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        for i, path in enumerate(paths):
+            file_digest = primary_digest if i == 0 else self._hash(path, cancel_event)
+            ext = os.path.splitext(path.replace(DISABLED_EXT, ''))[1].lower()
+            digest.update(f"{ext}:{file_digest}\n".encode("ascii"))
+        return digest.hexdigest()
+
+    def _fill_sizes(self, cancel_event=None):
+        with self._lock:
+            unknown = [rid for rid, entry in self._entries.items() if entry["set_size"] is None]
+        for record_id in unknown:
+            if cancel_event is not None and cancel_event.is_set():
+                raise ImportCancelled(record_id)
+            self._refresh(record_id)
+
+    def check_and_reserve(self, record_id, source_paths, cancel_event=None):
+        """Look for a mod with the same content as the mod set ``source_paths``.
+
+        ``source_paths`` lists the set's files, primary file first. If no
+        duplicate exists, ``record_id`` is entered into the index right away,
+        so a second copy of the same set in the same import batch is caught
+        too. Call :meth:`commit_reservation` once the files are in place, or
+        :meth:`remove` if the import fails.
+
+        Returns:
+            The id of the existing duplicate, or None.
+
+        Raises:
+            ImportCancelled: ``cancel_event`` was set while hashing.
+            OSError: A file of the set could not be read.
+        """
+        self._fill_sizes(cancel_event)
+        stats = _stat_files(source_paths)
+        set_size = _set_size(stats)
+        with self._lock:
+            candidates = list(self._by_size.get(set_size, ()))
+        content_hash = set_hash = None
+        if candidates:
+            content_hash = self._hash(source_paths[0], cancel_event)
+            set_hash = content_hash if len(stats) == 1 else \
+                self._set_digest(source_paths, content_hash, cancel_event)
+            for candidate_id in candidates:
+                entry = self._refresh(candidate_id, cancel_event, need_hash=True)
+                if entry is not None and entry["set_hash"] == set_hash:
+                    return candidate_id
+        with self._lock:
+            # The reservation points at the source until the copy has landed.
+            self._put_locked(record_id, {
+                "path": source_paths[0], "size": stats[0][1].st_size, "mtime_ns": None,
+                "content_hash": content_hash, "set_size": set_size,
+                "set_stamp": _set_stamp(stats), "set_hash": set_hash,
+            })
+        return None
+
+    def find_duplicates(self, cancel_event=None):
+        """Group every indexed mod by the content of its whole set.
+
+        Only mods sharing a set size with another mod are hashed, in parallel.
+
+        Returns:
+            A list of record id lists; each list has two or more mods with identical content.
+        """
+        self._fill_sizes(cancel_event)
+        with self._lock:
+            size_groups = [list(ids) for ids in self._by_size.values() if len(ids) > 1]
+        candidate_ids = [record_id for ids in size_groups for record_id in ids]
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+            entries = dict(zip(candidate_ids, pool.map(
+                lambda record_id: self._refresh(record_id, cancel_event, need_hash=True),
+                candidate_ids)))
+        groups = []
+        for ids in size_groups:
+            by_hash = {}
+            for record_id in ids:
+                entry = entries.get(record_id)
+                if entry is not None and entry["set_hash"]:
+                    by_hash.setdefault(entry["set_hash"], []).append(record_id)
+            groups.extend(group for group in by_hash.values() if len(group) > 1)
+        return groups
+
+
+def _set_files(path):
+    """Return the existing files of the mod set at catalog ``path``, primary file first."""
+    primary = existing_mod_file(path)
+    if primary is None:
+        return []
+    companions = (existing_mod_file(companion) for companion in companion_paths(path.replace(DISABLED_EXT, '')))
+    return [primary] + [companion for companion in companions if companion]
+
+
+def _stat_files(paths):
+    return [(path, os.stat(path)) for path in paths]
+
+
+def _set_size(stats):
+    return sum(st.st_size for _, st in stats)
+
+
+def _set_stamp(stats):
+    return [[os.path.splitext(path.replace(DISABLED_EXT, ''))[1].lower(), st.st_size, st.st_mtime_ns]
+            for path, st in stats]
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Load order as numeric file name prefixes.
+
+The game mounts mod paks in file name order, so the manager gives each mod a
+zero-padded prefix such as ``010_Lyfe_Swimsuit.pak``; the padding keeps
+string order and numeric order the same. The prefix each mod was given is
+remembered in its catalog record, so digits the user put at the start of a
+name (``2024_Skin.pak``) are part of the name, not a prefix. When the order
+changes, the largest set of mods whose prefixes are already in increasing
+order, with enough free numbers between them for the mods in between, keep
+their names. Only the others are renamed, with new prefixes spread out
+between their neighbours so that later moves find free numbers.
+"""
+
+import bisect
+import os
+import uuid
+from collections import Counter
+
+from file_ops import DISABLED_EXT, mod_file_paths
+
+PREFIX_WIDTH = 3  # Smallest prefix width; grows only once the numbers run out
+LOAD_ORDER_FIELD = "load_order_prefix"  # Record field holding the prefix the manager gave the mod
+
+
+def split_prefix(name, prefix):
+    """Return ``(prefix value or None, name without the prefix)``.
+
+    Args:
+        prefix: The digits the manager gave the mod, or None. Only these
+            count; a name that no longer starts with them has no prefix.
+    """
+    if not prefix or not prefix.isdecimal() or not name.startswith(prefix + "_"):
+        return None, name
+    return int(prefix), name[len(prefix) + 1:]
+
+
+def prefix_width(prefixes, count):
+    """Return the prefix width to use for ``count`` mods.
+
+    The width most prefixes already have is kept as long as it can number
+    every mod, so a growing library is not renamed all at once.
+    """
+    widths = Counter(len(prefix) for prefix in prefixes if prefix)
+    width = min(widths, key=lambda w: (-widths[w], w)) if widths else PREFIX_WIDTH
+    while 10 ** width < count:
+        width += 1
+    return width
+
+
+def load_order_key(path):
+    """Sort key giving the current load order of mods."""
+    return os.path.basename(path.replace(DISABLED_EXT, '')).casefold()
+
+
+def _kept_indices(values, limit):
+    """Return the largest set of mods that can keep their prefix.
+
+    Mods ``a < b`` can both keep theirs only if the ``b - a - 1`` mods
+    between them fit in between, i.e. ``values[b] - b >= values[a] - a``; the
+    ends of the range bound the first and last kept mod the same way. So the
+    answer is a longest non-decreasing subsequence of ``values[i] - i``.
+    """
+    count = len(values)
+    tails, tail_indices, previous = [], [], {}
+    for i, value in enumerate(values):
+        if value is None or not 0 <= value - i <= limit - count:
+            continue
+        slack = value - i
+        pos = bisect.bisect_right(tails, slack)
+        if pos == len(tails):
+            tails.append(slack)
+            tail_indices.append(i)
+        else:
+            tails[pos] = slack
+            tail_indices[pos] = i
+        previous[i] = tail_indices[pos - 1] if pos else None
+    kept = []
+    i = tail_indices[-1] if tail_indices else None
+    while i is not None:
+        kept.append(i)
+        i = previous[i]
+    return kept[::-1]
+
+
+def plan_prefixes(values, width):
+    """Return new prefix values, strictly increasing, for mods in their wanted order.
+
+    Args:
+        values: The current prefix of each mod in the wanted order, or None.
+        width: Prefix width; ``10 ** width`` must be at least ``len(values)``.
+    """
+    limit = 10 ** width
+    anchors = [-1] + _kept_indices(values, limit) + [len(values)]
+    planned = list(values)
+    for a, b in zip(anchors, anchors[1:]):
+        low = -1 if a < 0 else values[a]
+        high = limit if b == len(values) else values[b]
+        count = b - a - 1
+        # Spread out, so a later move into this gap finds a free number.
+        for j in range(1, count + 1):
+            planned[a + j] = low + j * (high - low) // (count + 1)
+    return planned
+
+
+def plan_load_order(mods):
+    """Return ``(old path, new path, new prefix)`` for the mods that must be renamed.
+
+    Args:
+        mods: ``(path, prefix)`` of each mod in the wanted load order: the
+            enabled path of its primary file and the prefix digits the
+            manager gave it, or None.
+    """
+    names = [split_prefix(os.path.basename(path), prefix) for path, prefix in mods]
+    prefixes = [prefix for (_, prefix), (value, _) in zip(mods, names) if value is not None]
+    width = prefix_width(prefixes, len(mods))
+    # Prefixes of another width would not sort by their number, so they are
+    # replaced rather than kept.
+    values = [value if value is not None and len(prefix) == width else None
+              for (_, prefix), (value, _) in zip(mods, names)]
+    planned = plan_prefixes(values, width)
+    changes = []
+    for (path, _), (_, rest), value, new_value in zip(mods, names, values, planned):
+        if value != new_value:
+            new_prefix = f"{new_value:0{width}d}"
+            changes.append((path, os.path.join(os.path.dirname(path), f"{new_prefix}_{rest}"), new_prefix))
+    return changes
+
+
+def load_order_jobs(changes):
+    """Turn ``(old path, new path, ...)`` changes into jobs for ``rename_mod_sets``.
+
+    Each file is renamed in whichever of its enabled or disabled forms
+    exists. A mod whose new name is still taken by another mod of the batch
+    first moves to a hidden temporary name, so the jobs must run in order
+    (``max_workers=1``).
+
+    Raises:
+        FileNotFoundError: A mod's primary file does not exist.
+        FileExistsError: A new name is taken by a file outside the batch.
+    """
+    mod_pairs = []
+    for old_path, new_path, *_ in changes:
+        pairs = []
+        for i, (old_file, new_file) in enumerate(zip(mod_file_paths(old_path), mod_file_paths(new_path))):
+            for suffix in ("", DISABLED_EXT):
+                if os.path.exists(old_file + suffix):
+                    pairs.append((old_file + suffix, new_file + suffix))
+                    break
+            else:
+                if i == 0:
+                    raise FileNotFoundError(old_path)
+        mod_pairs.append(pairs)
+    sources = {os.path.normcase(src) for pairs in mod_pairs for src, _ in pairs}
+    staged, direct, unstaged = [], [], []
+    for pairs in mod_pairs:
+        taken = False
+        for _, dst in pairs:
+            if os.path.exists(dst):
+                if os.path.normcase(dst) not in sources:
+                    raise FileExistsError(dst)
+                taken = True
+        if not taken:
+            direct.append(pairs)
+            continue
+        temp_pairs = [(src, os.path.join(os.path.dirname(src), f".{uuid.uuid4().hex}.tmp")) for src, _ in pairs]
+        staged.append(temp_pairs)
+        unstaged.append([(temp, dst) for (_, temp), (_, dst) in zip(temp_pairs, pairs)])
+    return staged + direct + unstaged
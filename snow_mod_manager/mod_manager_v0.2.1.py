@@ -1,20 +1,44 @@
 import os
 import sys
 import json
+import time
 import shutil
+import threading
 import webbrowser
-from collections import defaultdict
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QTreeWidget, QTreeWidgetItem, QTextEdit, QLabel,
+    QTreeView, QTextEdit, QLabel,
     QCheckBox, QPushButton, QFileDialog, QMessageBox, QFrame,
-    QLineEdit, QSplitter, QDialog, QComboBox, QDialogButtonBox,
-    QSizePolicy
+    QLineEdit, QSplitter, QDialog, QComboBox, QDialogButtonBox, QInputDialog,
+    QSizePolicy, QProgressBar, QListWidget, QListWidgetItem, QTreeWidget, QTreeWidgetItem,
+    QAbstractItemView, QMenu, QShortcut
 )
-from PyQt5.QtCore import Qt, QSize, pyqtSignal
-from PyQt5.QtGui import QPixmap, QIcon
+from PyQt5.QtCore import (
+    Qt, QSize, pyqtSignal, QAbstractItemModel, QModelIndex, QObject, QRunnable, QThreadPool,
+    QSortFilterProxyModel,
+    QFileSystemWatcher, QTimer
+)
+from PyQt5.QtGui import QPixmap, QImage, QIcon, QBrush, QColor, QKeySequence
 
 from translations import tr, set_language, get_translator
+from catalog import CATALOG_BACKENDS, CATALOG_LOAD_ERRORS, open_store, new_record_id
+from hashing import DuplicateIndex, HashCache
+from thumbnails import ThumbnailCache, thumbnail_size_for
+from search import SearchIndex
+from pak_index import PakIndexError, read_mod_assets
+from conflicts import ConflictIndex
+from load_order import LOAD_ORDER_FIELD, plan_load_order, load_order_jobs, load_order_key
+from scanner import (
+    scan_storage, scan_directories, list_directories, records_in, reconcile,
+    StatusCache, STATUS_ENABLED, STATUS_DISABLED, STATUS_MISSING
+)
+from file_ops import (
+    DISABLED_EXT, IMPORT_MODES, IMPORT_MODE_COPY, ARCHIVE_EXTENSIONS, ARCHIVE_ERRORS, ImportCancelled,
+    import_file, undo_import,
+    MOD_SET_EXTENSIONS, group_mod_files, find_mod_sets, existing_mod_file,
+    rename_mod_sets, toggle_pairs, trash_pairs, RenameJournal, RENAME_WORKERS, TRASH_DIR,
+    list_archive_members, member_basename, extract_members
+)
 
 # --- Constants ---
 APP_VERSION = "0.2.1"
@@ -27,9 +51,21 @@ CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".snowbreak_mod_manager")
 os.makedirs(CONFIG_DIR, exist_ok=True)
 PROJECTS_FILE = os.path.join(CONFIG_DIR, "projects.json")
 CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
+CATALOG_DB_FILE = os.path.join(CONFIG_DIR, "catalog.db")
+HASH_CACHE_FILE = os.path.join(CONFIG_DIR, "hash_cache.json")
+RENAME_JOURNAL_FILE = os.path.join(CONFIG_DIR, "rename_journal.json")
 IMAGES_DIR = os.path.join(CONFIG_DIR, "images")
 os.makedirs(IMAGES_DIR, exist_ok=True)
-DISABLED_EXT = ".disabled"
+THUMBNAILS_DIR = os.path.join(IMAGES_DIR, "thumbnails")
+AUTO_EXPAND_LIMIT = 500  # Libraries up to this size open fully expanded
+DEFAULT_IMPORT_PARALLELISM = 2  # Concurrent imports unless set in config.json
+WATCH_DEBOUNCE_MS = 500  # Quiet time after the last change in the storage path before it is rescanned
+UNDO_LIMIT = 20  # Enable/disable and delete operations that can be undone
+IMAGE_LOADER_THREADS = 2
+TASK_THREADS = 4  # Scans, renames and indexing; each kind runs one task at a time
+SEARCH_DEBOUNCE_MS = 200  # Pause in typing before the tree is filtered
+CONFLICT_COLOR = "#d9822b"  # Enabled mods that override an asset another enabled mod also overrides
+CONFLICT_DETAILS_LIMIT = 10  # Conflicting mods listed in the details panel
 
 # --- Light Theme (QSS) ---
 LIGHT_STYLESHEET = """
@@ -87,12 +123,12 @@ QCheckBox::indicator:checked {{
     border-color: #0078d4;
     image: url({check_svg_path});
 }}
-QTreeWidget {{
+QTreeView {{
     border: 1px solid #e0e0e0;
     border-radius: 8px;
     background-color: #fafafa;
 }}
-QTreeWidget::item:selected {{
+QTreeView::item:selected {{
     background-color: #cce4f7;
     color: #1c1c1c;
 }}
@@ -159,12 +195,12 @@ QCheckBox::indicator:checked {{
     border-color: #0078d4;
     image: url({check_svg_path});
 }}
-QTreeWidget {{
+QTreeView {{
     border: 1px solid #555;
     border-radius: 8px;
     background-color: #2d2d2d;
 }}
-QTreeWidget::item:selected {{
+QTreeView::item:selected {{
     background-color: #0078d4;
     color: #ffffff;
 }}
@@ -188,28 +224,688 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 class ImageLabel(QLabel):
+    """QLabel that keeps its pixmap scaled to fit.
+
+    While the label is being resized (e.g. dragging the splitter) the pixmap is
+    scaled with FastTransformation; one smooth scale follows once resizing has
+    paused. Scaling starts from the smallest of a chain of half-size copies
+    (mip levels) that still covers the target size.
+    """
+    SMOOTH_DELAY_MS = 150
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.setMinimumSize(1, 1)
         self._pixmap = QPixmap()
+        self._mips = []  # _pixmap, then successive half-size copies, built on demand
+        self._smooth_timer = QTimer(self)
+        self._smooth_timer.setSingleShot(True)
+        self._smooth_timer.setInterval(self.SMOOTH_DELAY_MS)
+        self._smooth_timer.timeout.connect(lambda: self._update_scaled_pixmap(Qt.SmoothTransformation))
 
     def setPixmap(self, pixmap):
         self._pixmap = pixmap
-        self._update_scaled_pixmap()
+        self._mips = [] if pixmap.isNull() else [pixmap]
+        self._smooth_timer.stop()
+        self._update_scaled_pixmap(Qt.SmoothTransformation)
 
     def resizeEvent(self, event):
-        self._update_scaled_pixmap()
+        self._update_scaled_pixmap(Qt.FastTransformation)
+        self._smooth_timer.start()
         super().resizeEvent(event)
 
-    def _update_scaled_pixmap(self):
+    def _mip_for(self, target):
+        """Returns the smallest mip level at least as large as ``target``."""
+        level = 0
+        while True:
+            if level + 1 == len(self._mips):
+                current = self._mips[level]
+                if current.width() < 2 * target.width() or current.height() < 2 * target.height():
+                    return current
+                self._mips.append(current.scaled(current.width() // 2, current.height() // 2,
+                                                 Qt.IgnoreAspectRatio, Qt.SmoothTransformation))
+            smaller = self._mips[level + 1]
+            if smaller.width() < target.width() or smaller.height() < target.height():
+                return self._mips[level]
+            level += 1
+
+    def _update_scaled_pixmap(self, transformation=Qt.SmoothTransformation):
         if self._pixmap.isNull():
             super().setPixmap(QPixmap())
             return
-        scaled_pixmap = self._pixmap.scaled(
-            self.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-        )
+        target = self._pixmap.size().scaled(self.size(), Qt.KeepAspectRatio)
+        if target.isEmpty():
+            return
+        scaled_pixmap = self._mip_for(target).scaled(target, Qt.KeepAspectRatio, transformation)
         super().setPixmap(scaled_pixmap)
 
+# --- Models ---
+
+class _TreeNode:
+    """A category or mod row in ModTreeModel."""
+    __slots__ = ("kind", "name", "parent", "children", "fetched", "record")
+
+    def __init__(self, kind, name, parent=None, record=None):
+        self.kind = kind  # "root", "category1", "category2" or "mod"
+        self.name = name
+        self.parent = parent
+        self.children = []
+        self.fetched = kind == "mod"
+        self.record = record
+
+    def row(self):
+        return self.parent.children.index(self) if self.parent else 0
+
+
+class ModTreeModel(QAbstractItemModel):
+    """Two-level category tree over the catalog, populated lazily.
+
+    Records are grouped by category up front, which only costs dict operations.
+    Tree nodes for a category's children are created the first time the view
+    expands it, and single-record changes insert or remove just the affected rows.
+    Mod rows expose the record's stable id under ``Qt.UserRole``.
+
+    Mod rows are checkable: the check state shows whether the mod is enabled,
+    and missing mods are drawn in red. The state comes from a StatusCache,
+    which lists a category folder once when its branch is first populated.
+    Toggling a check box only emits :attr:`enable_requested`; the window
+    renames the files. Mods with a conflict in the optional ConflictIndex are
+    drawn in orange.
+
+    The model also keeps :attr:`search_index` in step with every record it is
+    given, added, removed or updated.
+    """
+
+    enable_requested = pyqtSignal(str, bool)  # record id, enable
+
+    def __init__(self, parent=None, status_cache=None, conflict_index=None):
+        super().__init__(parent)
+        self._root = _TreeNode("root", "")
+        self._root.fetched = True
+        self._groups = {}  # category1 -> category2 -> [records]
+        self._mod_nodes = {}  # record id -> node, for mods whose branch is populated
+        self._header = tr("mod_tree_header")
+        self.status_cache = status_cache
+        self.conflict_index = conflict_index
+        self.search_index = SearchIndex(self.categories_of)
+
+    # --- Catalog access ---
+    @staticmethod
+    def categories_of(record):
+        return (record.get("category1", tr("tree_uncategorized")),
+                record.get("category2", tr("tree_default")))
+
+    def set_records(self, records):
+        records = list(records)
+        self.search_index.build(records)
+        self.beginResetModel()
+        self._groups = {}
+        self._mod_nodes = {}
+        self._root.children = []
+        for record in records:
+            cat1, cat2 = self.categories_of(record)
+            self._groups.setdefault(cat1, {}).setdefault(cat2, []).append(record)
+        self._root.children = [_TreeNode("category1", cat1, self._root) for cat1 in self._groups]
+        self.endResetModel()
+
+    def records_under(self, index):
+        """Returns every record in the category row ``index``, including unexpanded ones."""
+        if not index.isValid():
+            return []
+        node = index.internalPointer()
+        if node.kind == "category1":
+            return [record for mods in self._groups.get(node.name, {}).values() for record in mods]
+        if node.kind == "category2":
+            return list(self._groups.get(node.parent.name, {}).get(node.name, []))
+        return []
+
+    def record(self, index):
+        """Returns the project record behind ``index``, or None for category rows."""
+        if not index.isValid():
+            return None
+        return index.internalPointer().record
+
+    def set_header(self, text):
+        self._header = text
+        self.headerDataChanged.emit(Qt.Horizontal, 0, 0)
+
+    # --- Incremental updates ---
+    def add_record(self, record):
+        self.add_records([record])
+
+    def add_records(self, records):
+        """Adds several records, emitting one row insertion per affected branch."""
+        new_children = {}  # parent node -> nodes to append, in order
+        for record in records:
+            self.search_index.add(record)
+            cat1, cat2 = self.categories_of(record)
+            self._groups.setdefault(cat1, {}).setdefault(cat2, []).append(record)
+            cat1_node = self._child_node(self._root, cat1) or self._pending_child(new_children, self._root, cat1)
+            if cat1_node is None:
+                new_children.setdefault(self._root, []).append(_TreeNode("category1", cat1, self._root))
+                continue
+            if not cat1_node.fetched:
+                continue
+            cat2_node = self._child_node(cat1_node, cat2) or self._pending_child(new_children, cat1_node, cat2)
+            if cat2_node is None:
+                new_children.setdefault(cat1_node, []).append(_TreeNode("category2", cat2, cat1_node))
+                continue
+            if cat2_node.fetched:
+                new_children.setdefault(cat2_node, []).append(self._make_mod_node(cat2_node, record))
+        for parent_node, nodes in new_children.items():
+            first = len(parent_node.children)
+            self.beginInsertRows(self._node_index(parent_node), first, first + len(nodes) - 1)
+            parent_node.children.extend(nodes)
+            self.endInsertRows()
+
+    @staticmethod
+    def _pending_child(new_children, parent_node, name):
+        for node in new_children.get(parent_node, []):
+            if node.name == name:
+                return node
+        return None
+
+    def remove_record(self, record):
+        self.search_index.remove(record["id"])
+        cat1, cat2 = self.categories_of(record)
+        cat2_groups = self._groups.get(cat1, {})
+        mods = cat2_groups.get(cat2, [])
+        if record in mods:
+            mods.remove(record)
+        node = self._mod_nodes.pop(record["id"], None)
+        if node is not None:
+            self._remove_node(node)
+        if not mods:
+            cat2_groups.pop(cat2, None)
+            cat1_node = self._child_node(self._root, cat1)
+            cat2_node = self._child_node(cat1_node, cat2) if cat1_node else None
+            if cat2_node is not None:
+                self._remove_node(cat2_node)
+        if not cat2_groups:
+            self._groups.pop(cat1, None)
+            cat1_node = self._child_node(self._root, cat1)
+            if cat1_node is not None:
+                self._remove_node(cat1_node)
+
+    def update_record(self, record):
+        self.search_index.update(record)
+        node = self._mod_nodes.get(record["id"])
+        if node is None:
+            return
+        node.name = record.get("name", "")
+        index = self.createIndex(node.row(), 0, node)
+        self.dataChanged.emit(index, index)
+
+    def index_for_record(self, record):
+        """Returns the index of ``record``, populating its branch if needed."""
+        cat1, cat2 = self.categories_of(record)
+        cat1_node = self._child_node(self._root, cat1)
+        if cat1_node is None:
+            return QModelIndex()
+        self._ensure_fetched(cat1_node)
+        cat2_node = self._child_node(cat1_node, cat2)
+        if cat2_node is None:
+            return QModelIndex()
+        self._ensure_fetched(cat2_node)
+        node = self._mod_nodes.get(record["id"])
+        return self.createIndex(node.row(), 0, node) if node else QModelIndex()
+
+    def _child_node(self, parent_node, name):
+        for child in parent_node.children:
+            if child.name == name:
+                return child
+        return None
+
+    def _make_mod_node(self, parent_node, record):
+        node = _TreeNode("mod", record.get("name", ""), parent_node, record)
+        self._mod_nodes[record["id"]] = node
+        return node
+
+    def _node_index(self, node):
+        if node is self._root:
+            return QModelIndex()
+        return self.createIndex(node.row(), 0, node)
+
+    def _remove_node(self, node):
+        if node.kind == "mod":
+            self._mod_nodes.pop(node.record["id"], None)
+        row = node.row()
+        self.beginRemoveRows(self._node_index(node.parent), row, row)
+        node.parent.children.pop(row)
+        self.endRemoveRows()
+
+    def _ensure_fetched(self, node):
+        if not node.fetched:
+            self.fetchMore(self._node_index(node))
+
+    def _pending_children(self, node):
+        if node.kind == "category1":
+            return [_TreeNode("category2", cat2, node) for cat2 in self._groups.get(node.name, {})]
+        if node.kind == "category2":
+            mods = self._groups.get(node.parent.name, {}).get(node.name, [])
+            if self.status_cache is not None:
+                # One directory listing per folder instead of a stat per mod.
+                self.status_cache.ensure_scanned(
+                    {os.path.dirname(record.get("path", "")) for record in mods})
+            return [self._make_mod_node(node, record) for record in mods]
+        return []
+
+    def _status(self, record):
+        return self.status_cache.status(record.get("path", "")).state
+
+    def refresh_status(self):
+        """Repaints the state of every populated mod row, one signal per branch."""
+        roles = [Qt.CheckStateRole, Qt.ForegroundRole, Qt.ToolTipRole]
+        for cat1_node in self._root.children:
+            for cat2_node in cat1_node.children:
+                if cat2_node.children:
+                    first = self.createIndex(0, 0, cat2_node.children[0])
+                    last = self.createIndex(len(cat2_node.children) - 1, 0, cat2_node.children[-1])
+                    self.dataChanged.emit(first, last, roles)
+
+    def refresh_records(self, record_ids):
+        """Repaints the populated rows of ``record_ids``."""
+        roles = [Qt.ForegroundRole, Qt.ToolTipRole]
+        for record_id in record_ids:
+            node = self._mod_nodes.get(record_id)
+            if node is not None:
+                index = self.createIndex(node.row(), 0, node)
+                self.dataChanged.emit(index, index, roles)
+
+    def node_at(self, row, parent=QModelIndex()):
+        """Return the node of a row without creating a model index for it."""
+        parent_node = parent.internalPointer() if parent.isValid() else self._root
+        return parent_node.children[row]
+
+    # --- QAbstractItemModel interface ---
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        parent_node = parent.internalPointer() if parent.isValid() else self._root
+        return self.createIndex(row, column, parent_node.children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        return self._node_index(index.internalPointer().parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        node = parent.internalPointer() if parent.isValid() else self._root
+        return len(node.children)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = parent.internalPointer() if parent.isValid() else self._root
+        if node.fetched:
+            return bool(node.children)
+        return node.kind in ("category1", "category2")
+
+    def canFetchMore(self, parent):
+        return parent.isValid() and not parent.internalPointer().fetched
+
+    def fetchMore(self, parent):
+        if not parent.isValid():
+            return
+        node = parent.internalPointer()
+        if node.fetched:
+            return
+        children = self._pending_children(node)
+        node.fetched = True
+        if not children:
+            return
+        self.beginInsertRows(parent, 0, len(children) - 1)
+        node.children = children
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.DisplayRole:
+            return node.name
+        if node.record is None:
+            return None
+        if role == Qt.UserRole:
+            return node.record["id"]
+        if self.status_cache is None:
+            return None
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if self._status(node.record) == STATUS_ENABLED else Qt.Unchecked
+        if role in (Qt.ForegroundRole, Qt.ToolTipRole):
+            if self._status(node.record) == STATUS_MISSING:
+                return QBrush(QColor("red")) if role == Qt.ForegroundRole else tr("status_missing")
+            count = self.conflict_index.conflict_count(node.record["id"]) if self.conflict_index else 0
+            if count:
+                return QBrush(QColor(CONFLICT_COLOR)) if role == Qt.ForegroundRole \
+                    else tr("conflict_tooltip", count=count)
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and index.internalPointer().record is not None \
+                and self.status_cache is not None \
+                and self._status(index.internalPointer().record) != STATUS_MISSING:
+            flags |= Qt.ItemIsUserCheckable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or not index.isValid() or index.internalPointer().record is None:
+            return False
+        self.enable_requested.emit(index.internalPointer().record["id"], value == Qt.Checked)
+        return True
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self._header
+        return None
+
+class ModFilterProxyModel(QSortFilterProxyModel):
+    """Shows only the mods matching a search, plus the categories holding them.
+
+    Category rows are accepted from the set of categories of the matches, so
+    the lazy source model never has to populate a branch just to filter it.
+    Within a category, matching mods are sorted by their search rank.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._record_ids = None  # record id -> search rank; None shows everything
+        self._categories = set()
+        self._primary_categories = set()
+
+    def matches(self):
+        """Return the ids of the shown mods, or None when nothing is filtered."""
+        return self._record_ids
+
+    def set_matches(self, record_ids, categories):
+        """Show only ``record_ids``, a ``{record id: rank}`` dict, or everything if None."""
+        self._record_ids = record_ids
+        self._categories = categories
+        self._primary_categories = {cat1 for cat1, _ in categories}
+        # A reset drops the row mappings of every populated branch at once; they
+        # are rebuilt only for the branches the view shows, which is much cheaper
+        # than re-filtering thousands of hidden rows with invalidateFilter().
+        self.beginResetModel()
+        self.endResetModel()
+        # Without a search the catalog order is kept.
+        self.sort(0 if record_ids is not None else -1)
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._record_ids is None:
+            return True
+        node = self.sourceModel().node_at(source_row, source_parent)
+        if node.kind == "category1":
+            return node.name in self._primary_categories
+        if node.kind == "category2":
+            return (node.parent.name, node.name) in self._categories
+        return node.record["id"] in self._record_ids
+
+    def lessThan(self, left, right):
+        left_node, right_node = left.internalPointer(), right.internalPointer()
+        if self._record_ids is None or left_node.record is None or right_node.record is None:
+            return left.row() < right.row()
+        return (self._record_ids.get(left_node.record["id"], 0), left.row()) < \
+            (self._record_ids.get(right_node.record["id"], 0), right.row())
+
+# --- Background Workers ---
+
+class ImportSignals(QObject):
+    """Signals of an ImportTask; delivered on the GUI thread."""
+    progress = pyqtSignal(int, "qint64", "qint64")  # task id, bytes done, bytes total
+    finished = pyqtSignal(int, str)  # task id, error message ("" on success)
+    cancelled = pyqtSignal(int)
+    duplicate = pyqtSignal(int, str)  # task id, id of the mod with the same content
+
+
+class ImportTask(QRunnable):
+    """Imports one mod set into the storage path on a QThreadPool thread.
+
+    ``pairs`` lists ``(source, destination)`` for the .pak and its companion
+    files. If any file fails, the files already placed are taken back out.
+    With a ``dup_index`` the whole set is first checked against the library
+    and not imported when a mod with the same content already exists.
+    """
+
+    def __init__(self, task_id, pairs, mode=IMPORT_MODE_COPY, record_id=None, dup_index=None):
+        super().__init__()
+        self.task_id = task_id
+        self.pairs = pairs
+        self.mode = mode
+        self.record_id = record_id
+        self.dup_index = dup_index
+        self.cancel_event = threading.Event()
+        self.signals = ImportSignals()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        placed = []
+        try:
+            if self.dup_index is not None:
+                duplicate_id = self.dup_index.check_and_reserve(
+                    self.record_id, [src for src, _ in self.pairs], self.cancel_event)
+                if duplicate_id:
+                    self.signals.duplicate.emit(self.task_id, duplicate_id)
+                    return
+            sizes = [os.path.getsize(src) for src, _ in self.pairs]
+            total = sum(sizes)
+            offset = 0
+            for (src, dst), size in zip(self.pairs, sizes):
+                report = lambda done, _total, offset=offset: self.signals.progress.emit(
+                    self.task_id, offset + done, total)
+                used_mode = import_file(src, dst, self.mode,
+                                        progress=report, cancel_event=self.cancel_event)
+                placed.append((src, dst, used_mode))
+                offset += size
+        except ImportCancelled:
+            self._undo(placed)
+            self.signals.cancelled.emit(self.task_id)
+        except OSError as e:
+            self._undo(placed)
+            self.signals.finished.emit(self.task_id, str(e))
+        else:
+            self.signals.finished.emit(self.task_id, "")
+
+    @staticmethod
+    def _undo(placed):
+        for src, dst, used_mode in reversed(placed):
+            undo_import(src, dst, used_mode)
+
+
+class ArchiveImportTask(ImportTask):
+    """Streams one mod set out of an archive; ``pairs`` hold member names as sources."""
+
+    def __init__(self, task_id, archive_path, pairs, record_id=None, dup_index=None):
+        super().__init__(task_id, pairs, record_id=record_id, dup_index=dup_index)
+        self.archive_path = archive_path
+
+    def run(self):
+        try:
+            extract_members(self.archive_path, self.pairs,
+                            progress=self._report, cancel_event=self.cancel_event)
+            if self.dup_index is not None:
+                # Members cannot be hashed in place, so the check runs on the extracted files.
+                duplicate_id = self.dup_index.check_and_reserve(
+                    self.record_id, [dst for _, dst in self.pairs], self.cancel_event)
+                if duplicate_id:
+                    self._remove_targets()
+                    self.signals.duplicate.emit(self.task_id, duplicate_id)
+                    return
+        except ImportCancelled:
+            self._remove_targets()
+            self.signals.cancelled.emit(self.task_id)
+        except ARCHIVE_ERRORS as e:
+            self._remove_targets()
+            self.signals.finished.emit(self.task_id, str(e))
+        else:
+            self.signals.finished.emit(self.task_id, "")
+
+    def _report(self, done, total):
+        self.signals.progress.emit(self.task_id, done, total)
+
+    def _remove_targets(self):
+        for _, dst in self.pairs:
+            undo_import(None, dst, IMPORT_MODE_COPY)
+
+
+class RenameSignals(QObject):
+    finished = pyqtSignal(object, float)  # (src, dst) pairs renamed, seconds taken
+    failed = pyqtSignal(str)
+
+
+class RenameTask(QRunnable):
+    """Renames a batch of mod files on a worker thread, all or nothing.
+
+    The batch is recorded in ``journal`` while it runs, so a crash half-way
+    can be recovered on the next start.
+    """
+
+    def __init__(self, jobs, journal=None, max_workers=1):
+        super().__init__()
+        self.jobs = jobs
+        self.journal = journal
+        self.max_workers = max_workers
+        self.signals = RenameSignals()
+
+    def run(self):
+        started_at = time.monotonic()
+        try:
+            done = rename_mod_sets(self.jobs, max_workers=self.max_workers, journal=self.journal)
+        except OSError as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(done, time.monotonic() - started_at)
+
+
+class ThumbnailSignals(QObject):
+    loaded = pyqtSignal(int, str, int, str, QImage)  # generation, image path, thumbnail size, cache key, image
+
+
+class ThumbnailTask(QRunnable):
+    """Loads or creates one preview thumbnail off the GUI thread.
+
+    ``generation`` identifies the request and ``current_generation`` returns
+    the newest one. A request superseded before it started emits a null image
+    without decoding anything; the window ignores results of stale requests.
+    """
+
+    def __init__(self, thumbnails, generation, current_generation, image_path, thumbnail_size):
+        super().__init__()
+        self.thumbnails = thumbnails
+        self.generation = generation
+        self.current_generation = current_generation
+        self.image_path = image_path
+        self.thumbnail_size = thumbnail_size
+        self.signals = ThumbnailSignals()
+
+    def run(self):
+        if self.current_generation() != self.generation:
+            key, image = "", QImage()
+        else:
+            key, image = self.thumbnails.load_image(self.image_path, self.thumbnail_size)
+        self.signals.loaded.emit(self.generation, self.image_path, self.thumbnail_size, key, image)
+
+
+class DuplicateScanSignals(QObject):
+    finished = pyqtSignal(object)  # list of record id groups
+    failed = pyqtSignal(str)
+
+
+class DuplicateScanTask(QRunnable):
+    """Groups the whole library by content on a worker thread."""
+
+    def __init__(self, dup_index):
+        super().__init__()
+        self.dup_index = dup_index
+        self.signals = DuplicateScanSignals()
+
+    def run(self):
+        try:
+            groups = self.dup_index.find_duplicates()
+        except OSError as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(groups)
+
+
+class LibraryScanSignals(QObject):
+    finished = pyqtSignal(object)  # scanner.ScanResult
+    failed = pyqtSignal(str)
+
+
+class LibraryScanTask(QRunnable):
+    """Lists the storage path and diffs it against a snapshot of the catalog.
+
+    With ``directories`` only those folders (not their subfolders) and the
+    records inside them are compared.
+    """
+
+    def __init__(self, storage_path, records, hash_cache, directories=None):
+        super().__init__()
+        self.storage_path = storage_path
+        self.records = records
+        self.hash_cache = hash_cache
+        self.directories = directories
+        self.signals = LibraryScanSignals()
+
+    def run(self):
+        try:
+            if self.directories is None:
+                scanned = scan_storage(self.storage_path)
+                records = self.records
+            else:
+                scanned = scan_directories(self.storage_path, self.directories)
+                records = records_in(self.records, self.directories)
+            result = reconcile(records, scanned, self.hash_cache)
+        except OSError as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+class AssetIndexSignals(QObject):
+    finished = pyqtSignal(object)  # {record id: (asset paths, mtime_ns of the primary file)}
+
+
+class AssetIndexTask(QRunnable):
+    """Reads the asset lists of mods whose primary file changed since they were last read.
+
+    ``entries`` holds ``(record id, path, mtime_ns at the last read)``. Files
+    whose index cannot be parsed get an empty list, so they are not read again
+    until they change.
+    """
+
+    def __init__(self, entries):
+        super().__init__()
+        self.entries = entries
+        self.cancel_event = threading.Event()
+        self.signals = AssetIndexSignals()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        results = {}
+        for record_id, path, known_mtime_ns in self.entries:
+            if self.cancel_event.is_set():
+                break
+            file_path = existing_mod_file(path)
+            try:
+                mtime_ns = os.stat(file_path).st_mtime_ns if file_path else None
+                if mtime_ns is None or mtime_ns == known_mtime_ns:
+                    continue
+                assets = read_mod_assets(path)
+            except PakIndexError:
+                assets = []
+            except OSError:
+                continue
+            results[record_id] = (assets, mtime_ns)
+        self.signals.finished.emit(results)
+
 # --- Dialogs ---
 
 class AboutDialog(QDialog):
@@ -243,7 +939,7 @@ class AboutDialog(QDialog):
 
 
 class CategorySelectionDialog(QDialog):
-    def __init__(self, categories, parent=None):
+    def __init__(self, categories, parent=None, allow_infer=False):
         super().__init__(parent)
         self.setWindowTitle(tr("category_dialog_title"))
         self.categories = categories
@@ -259,6 +955,9 @@ class CategorySelectionDialog(QDialog):
         self.cat2_combo.setEditable(True)
         layout.addWidget(self.cat2_combo)
         self._update_cat2_combo(self.cat1_combo.currentText())
+        self.infer_check = QCheckBox(tr("infer_categories_from_folders"))
+        self.infer_check.setVisible(allow_infer)
+        layout.addWidget(self.infer_check)
         self.buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
         self.buttons.accepted.connect(self.accept)
         self.buttons.rejected.connect(self.reject)
@@ -273,18 +972,185 @@ class CategorySelectionDialog(QDialog):
     def get_selected_categories(self):
         return self.cat1_combo.currentText().strip(), self.cat2_combo.currentText().strip()
 
+    def infer_from_folders(self):
+        return self.infer_check.isChecked()
+
+class ArchiveMemberDialog(QDialog):
+    """Lets the user pick which files of an archive to import."""
+    def __init__(self, members, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(tr("archive_dialog_title"))
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(tr("archive_dialog_desc")))
+        self.member_list = QListWidget()
+        for name, size in members:
+            item = QListWidgetItem(f"{name}  ({size / 2**20:.1f} MB)")
+            item.setData(Qt.UserRole, name)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            is_mod_file = os.path.splitext(name)[1].lower() in MOD_SET_EXTENSIONS
+            item.setCheckState(Qt.Checked if is_mod_file else Qt.Unchecked)
+            self.member_list.addItem(item)
+        layout.addWidget(self.member_list)
+        self.buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        self.buttons.accepted.connect(self.accept)
+        self.buttons.rejected.connect(self.reject)
+        layout.addWidget(self.buttons)
+        self.setMinimumSize(500, 400)
+
+    def selected_members(self):
+        return [
+            self.member_list.item(row).data(Qt.UserRole)
+            for row in range(self.member_list.count())
+            if self.member_list.item(row).checkState() == Qt.Checked
+        ]
+
+class DuplicatesDialog(QDialog):
+    """Lists groups of mods whose files have identical content."""
+    def __init__(self, groups, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(tr("duplicates_dialog_title"))
+        layout = QVBoxLayout(self)
+        wasted = sum(group[0].get("size", 0) * (len(group) - 1) for group in groups)
+        summary = tr("duplicates_summary", count=len(groups), wasted=wasted / 2**20)
+        layout.addWidget(QLabel(summary if groups else tr("duplicates_none")))
+        tree = QTreeWidget()
+        tree.setHeaderLabels([tr("mod_name"), tr("mod_tree_header"), tr("mod_storage_path")])
+        for i, group in enumerate(groups, 1):
+            size_mb = group[0].get("size", 0) / 2**20
+            group_item = QTreeWidgetItem(tree, [tr("duplicates_group", index=i, size=size_mb)])
+            for project_data in group:
+                category = f"{project_data.get('category1', '')} / {project_data.get('category2', '')}"
+                QTreeWidgetItem(group_item, [project_data.get("name", ""), category,
+                                             project_data.get("path", "")])
+        tree.expandAll()
+        layout.addWidget(tree)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok)
+        buttons.accepted.connect(self.accept)
+        layout.addWidget(buttons)
+        self.resize(800, 450)
+
+class LibraryScanDialog(QDialog):
+    """Shows how the storage path differs from the catalog and asks to apply it."""
+    def __init__(self, result, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(tr("library_scan_title"))
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(tr("library_scan_summary", added=len(result.added),
+                                   missing=len(result.missing), moved=len(result.moved))))
+        tree = QTreeWidget()
+        tree.setHeaderLabels([tr("mod_name"), tr("mod_storage_path")])
+        if result.added:
+            group_item = QTreeWidgetItem(tree, [tr("library_scan_added", count=len(result.added))])
+            for mod in result.added:
+                QTreeWidgetItem(group_item, [os.path.basename(mod.path), mod.path])
+        if result.missing:
+            group_item = QTreeWidgetItem(tree, [tr("library_scan_missing", count=len(result.missing))])
+            for project_data in result.missing:
+                QTreeWidgetItem(group_item, [project_data.get("name", ""), project_data.get("path", "")])
+        if result.moved:
+            group_item = QTreeWidgetItem(tree, [tr("library_scan_moved", count=len(result.moved))])
+            for project_data, mod in result.moved:
+                QTreeWidgetItem(group_item, [project_data.get("name", ""),
+                                             f"{project_data.get('path', '')} -> {mod.path}"])
+        layout.addWidget(tree)
+        buttons = QDialogButtonBox(QDialogButtonBox.Apply | QDialogButtonBox.Cancel)
+        buttons.button(QDialogButtonBox.Apply).clicked.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.resize(800, 450)
+
+class LoadOrderDialog(QDialog):
+    """Lets the user drag mods into a new load order, across the library or within one category."""
+    def __init__(self, records, categories_of, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(tr("load_order_title"))
+        self._records = {project_data["id"]: project_data for project_data in records}
+        self._categories_of = categories_of
+        self._order = [project_data["id"] for project_data in records]
+        layout = QVBoxLayout(self)
+        self.scope_combo = QComboBox()
+        self.scope_combo.addItem(tr("load_order_all"), None)
+        for categories in sorted({categories_of(project_data) for project_data in records}):
+            self.scope_combo.addItem(" / ".join(categories), categories)
+        self.scope_combo.currentIndexChanged.connect(self._fill_list)
+        layout.addWidget(self.scope_combo)
+        layout.addWidget(QLabel(tr("load_order_hint")))
+        self.order_list = QListWidget()
+        self.order_list.setDragDropMode(QAbstractItemView.InternalMove)
+        layout.addWidget(self.order_list)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self._fill_list()
+        self.resize(600, 500)
+
+    def _store_scope_order(self):
+        # A category's mods keep the places they hold in the whole order;
+        # only their order among themselves changes.
+        new_ids = [self.order_list.item(row).data(Qt.UserRole) for row in range(self.order_list.count())]
+        scope = set(new_ids)
+        positions = [i for i, project_id in enumerate(self._order) if project_id in scope]
+        for position, project_id in zip(positions, new_ids):
+            self._order[position] = project_id
+
+    def _fill_list(self):
+        self._store_scope_order()
+        categories = self.scope_combo.currentData()
+        self.order_list.clear()
+        for project_id in self._order:
+            project_data = self._records[project_id]
+            if categories is not None and self._categories_of(project_data) != categories:
+                continue
+            item = QListWidgetItem(f"{project_data.get('name', '')}    ({os.path.basename(project_data['path'])})")
+            item.setData(Qt.UserRole, project_id)
+            self.order_list.addItem(item)
+
+    def order(self):
+        """Return the record ids in the new load order."""
+        self._store_scope_order()
+        return list(self._order)
+
 # --- Main Application Window ---
 
 class ProjectManagerWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.storage_path = os.path.join(os.path.expanduser("~"), "MyModProjects")
-        self.projects = []
+        self.projects = {}  # record id -> project record
         self.current_theme = "light" # Default theme
         self.current_language = "zh_CN"  # Default language
+        self.catalog_backend = "json"  # "json" or "sqlite"
+        self.import_parallelism = DEFAULT_IMPORT_PARALLELISM
+        self.import_mode = IMPORT_MODE_COPY
+        self.scan_on_startup = True
         self._load_config()
+        self.store = open_store(self.catalog_backend, PROJECTS_FILE, CATALOG_DB_FILE)
         set_language(self.current_language)  # Set global language
         self._load_projects_data()
+        self.rename_journal = RenameJournal(RENAME_JOURNAL_FILE)
+        self.undo_stack = []  # Most recent last: {"label", "renames", "deleted", "trash_dir"}
+        self._recover_renames()
+        self.hash_cache = HashCache(HASH_CACHE_FILE)
+        self.hash_cache.load()
+        self.dup_index = DuplicateIndex(self.hash_cache)
+        for project_data in self.projects.values():
+            self.dup_index.add_record(project_data)
+        self.status_cache = StatusCache()  # Filled by library scans, read on every selection
+        self.conflict_index = ConflictIndex()  # Asset overlaps between enabled mods
+        self.thumbnails = ThumbnailCache(THUMBNAILS_DIR, self.hash_cache)
+        self.image_pool = QThreadPool(self)  # Kept apart so imports never delay previews
+        self.image_pool.setMaxThreadCount(IMAGE_LOADER_THREADS)
+        self._image_generation = 0
+        self._image_tasks = {}  # generation -> ThumbnailTask, until its result arrives
+        self.import_pool = QThreadPool(self)
+        self.import_pool.setMaxThreadCount(self.import_parallelism)
+        self.task_pool = QThreadPool(self)  # Kept apart so long copies never delay renames and scans
+        self.task_pool.setMaxThreadCount(TASK_THREADS)
+        self._imports = {}  # task id -> {"task", "project", "done", "total"}
+        self._import_started_at = 0.0
+        self._import_finished_bytes = 0  # Bytes of imports completed since the pool went idle
+        self._next_import_id = 0
 
         self.setWindowTitle(tr("main_window_title"))
         self.resize(1280, 720)
@@ -292,8 +1158,24 @@ class ProjectManagerWindow(QMainWindow):
         
         self._setup_ui()
         self._apply_theme() # Apply theme on startup
+        self._rebuild_conflicts()
         self._populate_tree()
         self._update_details_panel(None)
+        self._library_scan = None
+        self._rename_task = None
+        self._dirty_dirs = set()
+        self.storage_watcher = QFileSystemWatcher(self)
+        self.storage_watcher.directoryChanged.connect(self._on_storage_changed)
+        self._watch_timer = QTimer(self)
+        self._watch_timer.setSingleShot(True)
+        self._watch_timer.setInterval(WATCH_DEBOUNCE_MS)
+        self._watch_timer.timeout.connect(self._flush_storage_changes)
+        self._watch_storage()
+        if self.scan_on_startup and os.path.isdir(self.storage_path):
+            self.rescan_library(quiet=True)
+        self._asset_task = None
+        self._assets_stale = False
+        self.update_asset_lists()
 
     def _setup_ui(self):
         central_widget = QWidget()
@@ -309,25 +1191,111 @@ class ProjectManagerWindow(QMainWindow):
         content_layout.addWidget(splitter)
         left_panel = QFrame()
         left_layout = QVBoxLayout(left_panel)
-        self.project_tree = QTreeWidget()
-        self.project_tree.setHeaderLabel(tr("mod_tree_header"))
-        self.project_tree.currentItemChanged.connect(self._on_item_selection_changed)
+        self.tree_model = ModTreeModel(self, self.status_cache, self.conflict_index)
+        self.tree_model.enable_requested.connect(self._on_tree_enable_requested)
+        self.tree_proxy = ModFilterProxyModel(self)
+        self.tree_proxy.setSourceModel(self.tree_model)
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText(tr("search_placeholder"))
+        self.search_edit.setClearButtonEnabled(True)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._apply_search)
+        self.search_edit.textChanged.connect(self._search_timer.start)
+        left_layout.addWidget(self.search_edit)
+        self.project_tree = QTreeView()
+        self.project_tree.setModel(self.tree_proxy)
+        self.project_tree.selectionModel().currentChanged.connect(self._on_item_selection_changed)
+        self.project_tree.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        # Rows all have one height, so filtering does not re-measure every row.
+        self.project_tree.setUniformRowHeights(True)
+        self.project_tree.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.project_tree.customContextMenuRequested.connect(self._show_tree_menu)
         left_layout.addWidget(self.project_tree)
+        library_btn_layout = QHBoxLayout()
+        library_btn_layout.addWidget(QLabel(tr("profile_label")))
+        self.profile_combo = QComboBox()
+        self.profile_combo.setMinimumWidth(140)
+        library_btn_layout.addWidget(self.profile_combo)
+        for key, handler in (("button_apply_profile", self.apply_profile),
+                             ("button_save_profile", self.save_profile),
+                             ("button_delete_profile", self.delete_profile)):
+            button = QPushButton(tr(key))
+            button.setProperty("tr_key", key)
+            button.clicked.connect(handler)
+            library_btn_layout.addWidget(button)
+        self._reload_profiles()
+        library_btn_layout.addStretch()
+        self.load_order_btn = QPushButton(tr("button_load_order"))
+        self.load_order_btn.setProperty("tr_key", "button_load_order")
+        self.load_order_btn.clicked.connect(self.edit_load_order)
+        library_btn_layout.addWidget(self.load_order_btn)
+        self.undo_btn = QPushButton(tr("button_undo"))
+        self.undo_btn.setProperty("tr_key", "button_undo")
+        self.undo_btn.clicked.connect(self.undo_last)
+        self.undo_btn.setEnabled(False)
+        library_btn_layout.addWidget(self.undo_btn)
+        QShortcut(QKeySequence.Undo, self.project_tree, self.undo_last)
+        self.rescan_btn = QPushButton(tr("button_rescan_library"))
+        self.rescan_btn.setProperty("tr_key", "button_rescan_library")
+        self.rescan_btn.clicked.connect(lambda: self.rescan_library())
+        library_btn_layout.addWidget(self.rescan_btn)
+        self.find_duplicates_btn = QPushButton(tr("button_find_duplicates"))
+        self.find_duplicates_btn.setProperty("tr_key", "button_find_duplicates")
+        self.find_duplicates_btn.clicked.connect(self.find_duplicates)
+        library_btn_layout.addWidget(self.find_duplicates_btn)
+        left_layout.addLayout(library_btn_layout)
         left_btn_layout = QHBoxLayout()
+        left_btn_layout.addWidget(QLabel(tr("import_mode")))
+        self.import_mode_combo = QComboBox()
+        for mode in IMPORT_MODES:
+            self.import_mode_combo.addItem(tr(f"import_mode_{mode}"), mode)
+        self.import_mode_combo.setCurrentIndex(IMPORT_MODES.index(self.import_mode))
+        self.import_mode_combo.currentIndexChanged.connect(self._on_import_mode_changed)
+        left_btn_layout.addWidget(self.import_mode_combo)
         add_btn = QPushButton(tr("button_add_mod"))
         add_btn.clicked.connect(self.add_project_from_file)
+        import_folder_btn = QPushButton(tr("button_import_folder"))
+        import_folder_btn.setProperty("tr_key", "button_import_folder")
+        import_folder_btn.clicked.connect(self.import_folder)
+        import_archive_btn = QPushButton(tr("button_import_archive"))
+        import_archive_btn.setProperty("tr_key", "button_import_archive")
+        import_archive_btn.clicked.connect(self.import_archive)
         delete_btn = QPushButton(tr("button_delete_mod"))
         delete_btn.setObjectName("DeleteButton")
         delete_btn.clicked.connect(self.delete_project)
         left_btn_layout.addStretch()
         left_btn_layout.addWidget(add_btn)
+        left_btn_layout.addWidget(import_folder_btn)
+        left_btn_layout.addWidget(import_archive_btn)
         left_btn_layout.addWidget(delete_btn)
         left_layout.addLayout(left_btn_layout)
+        self._setup_import_panel(left_layout)
         self._setup_details_panel()
         splitter.addWidget(left_panel)
         splitter.addWidget(self.details_frame)
         splitter.setSizes([350, 930])
 
+    def _setup_import_panel(self, parent_layout):
+        """Creates the progress row shown while imports are running."""
+        self.import_frame = QFrame()
+        import_layout = QVBoxLayout(self.import_frame)
+        import_layout.setContentsMargins(0, 0, 0, 0)
+        self.import_progress = QProgressBar()
+        self.import_progress.setRange(0, 1000)
+        import_layout.addWidget(self.import_progress)
+        status_layout = QHBoxLayout()
+        self.import_status_label = QLabel()
+        status_layout.addWidget(self.import_status_label, 1)
+        cancel_btn = QPushButton(tr("button_cancel_import"))
+        cancel_btn.setProperty("tr_key", "button_cancel_import")
+        cancel_btn.clicked.connect(self.cancel_imports)
+        status_layout.addWidget(cancel_btn)
+        import_layout.addLayout(status_layout)
+        self.import_frame.setVisible(False)
+        parent_layout.addWidget(self.import_frame)
+
     def _setup_top_bar(self, parent_layout):
         """Creates the top bar for path, theme toggle, language selection, and about button."""
         top_layout = QHBoxLayout()
@@ -385,6 +1353,10 @@ class ProjectManagerWindow(QMainWindow):
         save_changes_btn.clicked.connect(self.save_current_project_details)
         controls_layout.addWidget(save_changes_btn)
         details_layout.addLayout(controls_layout)
+        self.details_conflicts_label = QLabel()
+        self.details_conflicts_label.setWordWrap(True)
+        self.details_conflicts_label.setStyleSheet(f"color: {CONFLICT_COLOR};")
+        details_layout.addWidget(self.details_conflicts_label)
         self.details_frame.setVisible(False)
     
     # --- Theme Management ---
@@ -429,10 +1401,14 @@ class ProjectManagerWindow(QMainWindow):
         """Refresh all UI text after language change."""
         self.setWindowTitle(tr("main_window_title"))
         self.path_edit.setPlaceholderText(tr("mod_storage_path"))
-        self.project_tree.setHeaderLabel(tr("mod_tree_header"))
+        self.search_edit.setPlaceholderText(tr("search_placeholder"))
+        self.tree_model.set_header(tr("mod_tree_header"))
         # Find and update buttons in left panel
         for btn in self.findChildren(QPushButton):
-            if "add" in btn.text().lower() or "添加" in btn.text():
+            tr_key = btn.property("tr_key")
+            if tr_key:
+                btn.setText(tr(tr_key))
+            elif "add" in btn.text().lower() or "添加" in btn.text():
                 btn.setText(tr("button_add_mod"))
             elif "delete" in btn.text().lower() or "删除" in btn.text():
                 btn.setText(tr("button_delete_mod"))
@@ -451,19 +1427,16 @@ class ProjectManagerWindow(QMainWindow):
         
     # --- Data and Config Management ---
     def _load_projects_data(self):
-        if not os.path.exists(PROJECTS_FILE):
-            self.projects = []
-            return
         try:
-            with open(PROJECTS_FILE, "r", encoding="utf-8") as f:
-                self.projects = json.load(f)
-        except (json.JSONDecodeError, TypeError):
+            records = self.store.load()
+        except CATALOG_LOAD_ERRORS:
             QMessageBox.critical(self, tr("error_title"), tr("error_load_projects"))
-            self.projects = []
+            records = []
+        self.projects = {record["id"]: record for record in records}
 
-    def save_projects(self):
-        with open(PROJECTS_FILE, "w", encoding="utf-8") as f:
-            json.dump(self.projects, f, ensure_ascii=False, indent=2)
+    def _save_project(self, project_data):
+        """Journals a single added or edited project."""
+        self.store.put(project_data)
 
     def _load_config(self):
         if os.path.exists(CONFIG_FILE):
@@ -473,6 +1446,16 @@ class ProjectManagerWindow(QMainWindow):
                     self.storage_path = config.get("storage_path", self.storage_path)
                     self.current_theme = config.get("theme", "light") # Load theme
                     self.current_language = config.get("language", "zh_CN")  # Load language
+                    backend = config.get("catalog_backend", "json")
+                    if backend in CATALOG_BACKENDS:
+                        self.catalog_backend = backend
+                    import_mode = config.get("import_mode", IMPORT_MODE_COPY)
+                    if import_mode in IMPORT_MODES:
+                        self.import_mode = import_mode
+                    parallelism = config.get("import_parallelism", DEFAULT_IMPORT_PARALLELISM)
+                    if isinstance(parallelism, int) and parallelism > 0:
+                        self.import_parallelism = parallelism
+                    self.scan_on_startup = bool(config.get("scan_on_startup", True))
             except (json.JSONDecodeError, TypeError):
                 pass
 
@@ -480,75 +1463,152 @@ class ProjectManagerWindow(QMainWindow):
         config = {
             "storage_path": self.storage_path,
             "theme": self.current_theme, # Save theme
-            "language": self.current_language  # Save language
+            "language": self.current_language,  # Save language
+            "catalog_backend": self.catalog_backend,
+            "import_parallelism": self.import_parallelism,
+            "import_mode": self.import_mode,
+            "scan_on_startup": self.scan_on_startup
         }
         with open(CONFIG_FILE, "w", encoding="utf-8") as f:
             json.dump(config, f, indent=2)
 
     def closeEvent(self, event):
-        self.save_projects()
+        self.cancel_imports()
+        if self._asset_task is not None:
+            self._asset_task.cancel()
+        self.image_pool.clear()
+        self.import_pool.waitForDone()
+        self.task_pool.waitForDone()
+        self.image_pool.waitForDone()
+        # Deletions cannot be undone after exit, so the trash is emptied now.
+        shutil.rmtree(os.path.join(self.storage_path, TRASH_DIR), ignore_errors=True)
+        self.store.close()
+        # Image digests key the thumbnail cache, so they are kept alongside the mods'.
+        keep_paths = [p.get("path", "") for p in self.projects.values()]
+        keep_paths.extend(p["image_path"] for p in self.projects.values() if p.get("image_path"))
+        self.hash_cache.save(keep_paths=keep_paths)
         event.accept()
 
     # --- Core Functionality (Remaining methods are mostly unchanged) ---
     def _populate_tree(self):
-        self.project_tree.clear()
-        category_items = {}
-        for i, project_data in enumerate(self.projects):
-            cat1_name = project_data.get("category1", tr("tree_uncategorized"))
-            cat2_name = project_data.get("category2", tr("tree_default"))
-            if cat1_name not in category_items:
-                cat1_item = QTreeWidgetItem(self.project_tree, [cat1_name])
-                category_items[cat1_name] = cat1_item
-            cat1_item = category_items[cat1_name]
-            cat2_key = f"{cat1_name}/{cat2_name}"
-            if cat2_key not in category_items:
-                cat2_item = QTreeWidgetItem(cat1_item, [cat2_name])
-                category_items[cat2_key] = cat2_item
-            cat2_item = category_items[cat2_key]
-            mod_item = QTreeWidgetItem(cat2_item, [project_data["name"]])
-            mod_item.setData(0, Qt.UserRole, i)
-        self.project_tree.expandAll()
-
-    def _on_item_selection_changed(self, current_item, previous_item):
-        if not current_item:
-            self._update_details_panel(None)
-            return
-        project_index = current_item.data(0, Qt.UserRole)
-        if project_index is not None:
-            self._update_details_panel(self.projects[project_index])
-        else:
-            self._update_details_panel(None)
+        self.tree_model.set_records(self.projects.values())
+        self._apply_search()
+
+    def _expand_records(self, records):
+        """Expands every category holding ``records``."""
+        for record in records:
+            self.project_tree.expand(self.tree_proxy.mapFromSource(
+                self.tree_model.index_for_record(record).parent()))
+        for row in range(self.tree_proxy.rowCount()):
+            self.project_tree.expand(self.tree_proxy.index(row, 0))
+
+    def _apply_search(self):
+        """Filters the tree down to the mods matching the search box."""
+        self._search_timer.stop()
+        current = self._current_project()
+        matches = self.tree_model.search_index.search(self.search_edit.text())
+        categories = self.tree_model.search_index.categories(matches) if matches is not None else set()
+        self.tree_proxy.set_matches(matches, categories)
+        shown = self.projects.values() if matches is None else \
+            [self.projects[project_id] for project_id in matches if project_id in self.projects]
+        if len(shown) <= AUTO_EXPAND_LIMIT:
+            # Small libraries and results keep the fully expanded view; large ones expand on demand.
+            self._expand_records(shown)
+        if current is not None and (matches is None or current["id"] in matches):
+            index = self.tree_proxy.mapFromSource(self.tree_model.index_for_record(current))
+            self.project_tree.setCurrentIndex(index)
+            self._reveal_project(current)
+
+    def _current_project_id(self):
+        """Returns the id of the project in the current tree row, or None."""
+        return self.project_tree.currentIndex().data(Qt.UserRole)
+
+    def _current_project(self):
+        """Returns the project record of the current tree row, or None."""
+        return self.projects.get(self._current_project_id())
+
+    def _reveal_project(self, project_data):
+        """Expands the branch holding ``project_data`` and scrolls it into view."""
+        index = self.tree_proxy.mapFromSource(self.tree_model.index_for_record(project_data))
+        if index.isValid():
+            self.project_tree.expand(index.parent().parent())
+            self.project_tree.expand(index.parent())
+            self.project_tree.scrollTo(index)
+
+    def _on_item_selection_changed(self, current, previous):
+        self._update_details_panel(self.projects.get(current.data(Qt.UserRole)))
 
     def _update_details_panel(self, project_data):
         if project_data is None:
             self.details_frame.setVisible(False)
             return
         self.details_frame.setVisible(True)
-        self.details_frame.setProperty("current_project_path", project_data.get("path"))
+        self.details_frame.setProperty("current_project_id", project_data["id"])
         for widget in [self.details_name_edit, self.details_note_edit, self.details_enable_check]:
             widget.blockSignals(True)
         self.details_name_edit.setText(project_data.get("name", ""))
         self.details_note_edit.setPlainText(project_data.get("note", ""))
-        image_path = project_data.get("image_path")
-        if image_path and os.path.exists(image_path):
-            self.details_image.setPixmap(QPixmap(image_path))
-        else:
-            self.details_image.setPixmap(QPixmap())
-            self.details_image.setText(tr("no_image"))
-        file_path = project_data.get("path", "")
-        enabled_path = file_path.replace(DISABLED_EXT, '')
-        disabled_path = enabled_path + DISABLED_EXT
-        is_missing = not os.path.exists(enabled_path) and not os.path.exists(disabled_path)
+        self._show_preview(project_data.get("image_path"))
+        state = self.status_cache.status(project_data.get("path", "")).state
+        is_missing = state == STATUS_MISSING
         self.details_enable_check.setEnabled(not is_missing)
         if is_missing:
             self.details_enable_check.setChecked(False)
             self.details_name_edit.setStyleSheet("color: red; font-size: 14pt; font-weight: bold;")
         else:
             self.details_name_edit.setStyleSheet("font-size: 14pt; font-weight: bold;")
-            is_disabled = os.path.exists(disabled_path)
-            self.details_enable_check.setChecked(not is_disabled)
+            self.details_enable_check.setChecked(state == STATUS_ENABLED)
         for widget in [self.details_name_edit, self.details_note_edit, self.details_enable_check]:
             widget.blockSignals(False)
+        self._show_conflicts(project_data)
+
+    def _show_conflicts(self, project_data):
+        """Lists the enabled mods that override the same assets as ``project_data``."""
+        conflicts = self.conflict_index.conflicts_of(project_data["id"])
+        self.details_conflicts_label.setVisible(bool(conflicts))
+        if not conflicts:
+            return
+        ranked = sorted(conflicts.items(), key=lambda item: -len(item[1]))
+        lines = [tr("conflict_entry", name=self.projects[other]["name"] if other in self.projects else other,
+                    count=len(keys))
+                 for other, keys in ranked[:CONFLICT_DETAILS_LIMIT]]
+        if len(ranked) > CONFLICT_DETAILS_LIMIT:
+            lines.append(tr("conflict_more", count=len(ranked) - CONFLICT_DETAILS_LIMIT))
+        self.details_conflicts_label.setText(tr("conflict_header") + "\n" + "\n".join(lines))
+        shared = sorted({key for keys in conflicts.values() for key in keys})
+        self.details_conflicts_label.setToolTip("\n".join(shared[:50]))
+
+    def _show_preview(self, image_path):
+        """Shows a cached thumbnail at once, or a placeholder while a worker decodes it."""
+        # Requests still queued are for mods the user has already moved past; they are skipped.
+        self._image_generation += 1
+        if not image_path:
+            self.details_image.setPixmap(QPixmap())
+            self.details_image.setText(tr("no_image"))
+            return
+        thumbnail_size = thumbnail_size_for(self.details_image.size())
+        pixmap = self.thumbnails.cached_pixmap(image_path, thumbnail_size)
+        if pixmap is not None:
+            self.details_image.setPixmap(pixmap)
+            return
+        self.details_image.setPixmap(QPixmap())
+        self.details_image.setText(tr("image_loading"))
+        task = ThumbnailTask(self.thumbnails, self._image_generation,
+                             lambda: self._image_generation, image_path, thumbnail_size)
+        task.signals.loaded.connect(self._on_thumbnail_loaded)
+        self._image_tasks[self._image_generation] = task  # Keeps the signal object alive until delivery
+        self.image_pool.start(task)
+
+    def _on_thumbnail_loaded(self, generation, image_path, thumbnail_size, key, image):
+        self._image_tasks.pop(generation, None)
+        if image.isNull():
+            if generation == self._image_generation:
+                self.details_image.setText(tr("no_image"))
+            return
+        # Stale results are still cached, but not shown.
+        pixmap = self.thumbnails.insert(image_path, thumbnail_size, key, image)
+        if generation == self._image_generation:
+            self.details_image.setPixmap(pixmap)
 
     def browse_storage_path(self):
         path = QFileDialog.getExistingDirectory(self, tr("select_folder_title"), self.storage_path)
@@ -556,93 +1616,796 @@ class ProjectManagerWindow(QMainWindow):
             self.storage_path = path
             self.path_edit.setText(path)
             self._save_config()
+            self._watch_storage()
             QMessageBox.information(self, tr("message_path_updated"), 
                                   tr("message_path_updated_desc", path=path))
             
     def add_project_from_file(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, tr("select_mod_file_title"), "", tr("file_filter_all"))
-        if not file_path: return
-        categories = defaultdict(set)
-        for p in self.projects:
-            if "category1" in p and "category2" in p:
-                categories[p["category1"]].add(p["category2"])
-        dialog = CategorySelectionDialog(categories, self)
+        file_paths, _ = QFileDialog.getOpenFileNames(self, tr("select_mod_file_title"), "", tr("file_filter_all"))
+        if not file_paths: return
+        dialog = CategorySelectionDialog(self.store.categories(), self)
         if not dialog.exec_(): return
         cat1, cat2 = dialog.get_selected_categories()
         if not cat1 or not cat2:
             QMessageBox.warning(self, tr("warning_invalid_category"), 
                               tr("warning_invalid_category_desc"))
             return
-        file_name = os.path.basename(file_path)
-        dest_dir = os.path.join(self.storage_path, cat1, cat2)
-        os.makedirs(dest_dir, exist_ok=True)
-        dest_path = os.path.join(dest_dir, file_name)
-        if os.path.exists(dest_path) or os.path.exists(dest_path + DISABLED_EXT):
-            QMessageBox.warning(self, tr("warning_file_exists"), 
-                              tr("warning_file_exists_desc", filename=file_name))
+        self._import_mod_sets([(files, cat1, cat2) for files in group_mod_files(file_paths)])
+
+    def import_folder(self):
+        """Imports every mod set found below a folder in one batch."""
+        folder = QFileDialog.getExistingDirectory(self, tr("select_import_folder_title"))
+        if not folder: return
+        mod_sets = find_mod_sets(folder)
+        if not mod_sets:
+            QMessageBox.information(self, tr("message_import_title"), tr("message_no_mods_found"))
             return
+        dialog = CategorySelectionDialog(self.store.categories(), self, allow_infer=True)
+        if not dialog.exec_(): return
+        cat1, cat2 = dialog.get_selected_categories()
+        jobs = []
+        for rel_parts, files in mod_sets:
+            set_cat1, set_cat2 = cat1, cat2
+            if dialog.infer_from_folders():
+                # <folder>/<category1>/<category2>/mod.pak; deeper levels are ignored.
+                set_cat1 = rel_parts[0] if len(rel_parts) >= 1 else cat1
+                set_cat2 = rel_parts[1] if len(rel_parts) >= 2 else cat2
+            if not set_cat1 or not set_cat2:
+                QMessageBox.warning(self, tr("warning_invalid_category"), 
+                                  tr("warning_invalid_category_desc"))
+                return
+            jobs.append((files, set_cat1, set_cat2))
+        self._import_mod_sets(jobs)
+
+    def import_archive(self):
+        """Imports mod sets picked from a .zip or tar archive without unpacking it."""
+        archive_path, _ = QFileDialog.getOpenFileName(
+            self, tr("select_archive_title"), "",
+            tr("file_filter_archives", patterns=" ".join(f"*{ext}" for ext in ARCHIVE_EXTENSIONS)))
+        if not archive_path: return
         try:
-            shutil.copy(file_path, dest_path)
-        except OSError as e:
-            QMessageBox.critical(self, tr("error_copy_file"), 
-                               tr("error_copy_file_desc", error=str(e)))
+            members = list_archive_members(archive_path)
+        except ARCHIVE_ERRORS as e:
+            QMessageBox.critical(self, tr("error_title"), tr("error_read_archive", error=str(e)))
             return
-        project_data = {
-            "name": os.path.splitext(file_name)[0], "path": dest_path,
-            "note": tr("original_file") + f" {file_name}", "image_path": "",
-            "category1": cat1, "category2": cat2
+        member_dialog = ArchiveMemberDialog(members, self)
+        if not member_dialog.exec_(): return
+        selected = member_dialog.selected_members()
+        if not selected: return
+        dialog = CategorySelectionDialog(self.store.categories(), self)
+        if not dialog.exec_(): return
+        cat1, cat2 = dialog.get_selected_categories()
+        if not cat1 or not cat2:
+            QMessageBox.warning(self, tr("warning_invalid_category"), 
+                              tr("warning_invalid_category_desc"))
+            return
+        self._import_mod_sets([(files, cat1, cat2) for files in group_mod_files(selected)],
+                              archive=(archive_path, dict(members)))
+
+    # --- Background Imports ---
+    def _import_target_taken(self, dest_path):
+        """True if ``dest_path`` exists on disk or is the target of a running import."""
+        if os.path.exists(dest_path) or os.path.exists(dest_path + DISABLED_EXT):
+            return True
+        return any(dest_path in state["targets"] for state in self._imports.values())
+
+    def _on_import_mode_changed(self, index):
+        self.import_mode = self.import_mode_combo.itemData(index)
+        self._save_config()
+
+    def _import_mod_sets(self, jobs, archive=None):
+        """Queues ``(files, category1, category2)`` jobs as one import batch.
+
+        Files are copied in parallel on the import pool. The catalog and the tree
+        are updated once, when every job of the batch has finished.
+
+        If ``archive`` is given as ``(archive_path, {member: size})``, the files of
+        each job are members of that archive and are streamed out of it.
+        """
+        batch = {"pending": set(), "projects": [], "errors": [], "skipped": [], "duplicates": []}
+        for files, cat1, cat2 in jobs:
+            basename = member_basename if archive else os.path.basename
+            file_name = basename(files[0])
+            dest_dir = os.path.join(self.storage_path, cat1, cat2)
+            pairs = [(src, os.path.join(dest_dir, basename(src))) for src in files]
+            if any(self._import_target_taken(dst) for _, dst in pairs):
+                batch["skipped"].append(file_name)
+                continue
+            try:
+                os.makedirs(dest_dir, exist_ok=True)
+                if archive:
+                    total = sum(archive[1][src] for src, _ in pairs)
+                else:
+                    total = sum(os.path.getsize(src) for src, _ in pairs)
+            except OSError as e:
+                batch["errors"].append(f"{file_name}: {e}")
+                continue
+            project_data = {
+                "id": new_record_id(),
+                "name": os.path.splitext(file_name)[0], "path": pairs[0][1],
+                "note": tr("original_file") + f" {file_name}", "image_path": "",
+                "category1": cat1, "category2": cat2
+            }
+            task_id = self._next_import_id
+            self._next_import_id += 1
+            if archive:
+                task = ArchiveImportTask(task_id, archive[0], pairs,
+                                         project_data["id"], self.dup_index)
+            else:
+                task = ImportTask(task_id, pairs, self.import_mode,
+                                  project_data["id"], self.dup_index)
+            self._start_import(batch, task, total, project_data)
+        if not batch["pending"]:
+            self._finish_import_batch(batch)
+
+    def _start_import(self, batch, task, total, project_data):
+        """Queues the import task of one mod set on the import pool."""
+        task_id = task.task_id
+        task.signals.progress.connect(self._on_import_progress)
+        task.signals.finished.connect(self._on_import_finished)
+        task.signals.cancelled.connect(self._on_import_cancelled)
+        task.signals.duplicate.connect(self._on_import_duplicate)
+        if not self._imports:
+            self._import_started_at = time.monotonic()
+            self._import_finished_bytes = 0
+        self._imports[task_id] = {
+            "task": task, "batch": batch, "project": project_data, "done": 0, "total": total,
+            "targets": [dst for _, dst in task.pairs],
         }
-        self.projects.append(project_data)
-        self.save_projects()
-        self._populate_tree()
+        batch["pending"].add(task_id)
+        self.import_pool.start(task)
+        self._update_import_status()
+
+    def cancel_imports(self):
+        """Cancels every queued and running import."""
+        for state in self._imports.values():
+            state["task"].cancel()
+
+    def _on_import_progress(self, task_id, done, total):
+        state = self._imports.get(task_id)
+        if state is None: return
+        state["done"], state["total"] = done, total
+        self._update_import_status()
+
+    def _on_import_finished(self, task_id, error):
+        state = self._imports.pop(task_id, None)
+        if state is None: return
+        batch = state["batch"]
+        if error:
+            self.dup_index.remove(state["project"]["id"])
+            batch["errors"].append(f"{state['project']['name']}: {error}")
+        else:
+            self._import_finished_bytes += state["total"]
+            batch["projects"].append(state["project"])
+        self._end_import_task(batch, task_id)
+
+    def _on_import_cancelled(self, task_id):
+        state = self._imports.pop(task_id, None)
+        if state is None: return
+        self.dup_index.remove(state["project"]["id"])
+        self._end_import_task(state["batch"], task_id)
+
+    def _on_import_duplicate(self, task_id, existing_id):
+        state = self._imports.pop(task_id, None)
+        if state is None: return
+        existing = self.projects.get(existing_id) or self._pending_import_project(existing_id)
+        state["batch"]["duplicates"].append(tr(
+            "duplicate_entry", name=state["project"]["name"],
+            existing=existing["name"] if existing else existing_id))
+        self._end_import_task(state["batch"], task_id)
+
+    def _pending_import_project(self, project_id):
+        """Returns the project of a running import, for duplicates within one batch."""
+        for state in self._imports.values():
+            if state["project"]["id"] == project_id:
+                return state["project"]
+        return None
+
+    def _end_import_task(self, batch, task_id):
+        batch["pending"].discard(task_id)
+        self._update_import_status()
+        if not batch["pending"]:
+            self._finish_import_batch(batch)
+
+    def _finish_import_batch(self, batch):
+        """Commits all imported projects of a batch in one store transaction."""
+        projects = batch["projects"]
+        if projects:
+            for project_data in projects:
+                self.projects[project_data["id"]] = project_data
+                self.dup_index.commit_reservation(project_data["id"], project_data["path"])
+                self.status_cache.set_state(project_data["path"], STATUS_ENABLED)
+            new_ids = {project_data["id"] for project_data in projects}
+            changed = [p for p in self._apply_index_changes() if p["id"] not in new_ids]
+            self.store.put_many(projects + changed)
+            self.tree_model.add_records(projects)
+            self._reveal_project(projects[0])
+            self.update_asset_lists()
+        if batch["skipped"]:
+            QMessageBox.warning(self, tr("warning_file_exists"), 
+                              tr("warning_file_exists_desc", filename=", ".join(batch["skipped"])))
+        if batch["duplicates"]:
+            QMessageBox.information(self, tr("message_import_title"), 
+                                  tr("message_duplicates_skipped", list="\n".join(batch["duplicates"])))
+        if batch["errors"]:
+            QMessageBox.critical(self, tr("error_copy_file"), 
+                               tr("error_copy_file_desc", error="\n".join(batch["errors"])))
+
+    # --- Duplicate Detection ---
+    def _apply_index_changes(self):
+        """Copies sizes and hashes learned by the duplicate index onto their records.
+
+        Returns the records that changed; the caller persists them.
+        """
+        changed = []
+        for project_id, entry in self.dup_index.take_changed().items():
+            project_data = self.projects.get(project_id)
+            if project_data is None:
+                continue
+            project_data["size"] = entry["size"]
+            project_data["mtime_ns"] = entry["mtime_ns"]
+            project_data["content_hash"] = entry["content_hash"]
+            changed.append(project_data)
+        return changed
+
+    def find_duplicates(self):
+        """Hashes same-sized mods in the background and lists identical ones."""
+        self.find_duplicates_btn.setEnabled(False)
+        task = DuplicateScanTask(self.dup_index)
+        task.signals.finished.connect(self._on_duplicate_scan_finished)
+        task.signals.failed.connect(self._on_duplicate_scan_failed)
+        self._duplicate_scan = task  # Keeps the signal object alive until delivery
+        self.task_pool.start(task)
+
+    def _on_duplicate_scan_finished(self, groups):
+        self.find_duplicates_btn.setEnabled(True)
+        changed = self._apply_index_changes()
+        if changed:
+            self.store.put_many(changed)
+        self.hash_cache.save()
+        record_groups = [
+            [self.projects[project_id] for project_id in group if project_id in self.projects]
+            for group in groups
+        ]
+        DuplicatesDialog([group for group in record_groups if len(group) > 1], self).exec_()
+
+    def _on_duplicate_scan_failed(self, error):
+        self.find_duplicates_btn.setEnabled(True)
+        QMessageBox.critical(self, tr("error_title"), error)
+
+    # --- Asset Lists ---
+    def update_asset_lists(self):
+        """Reads the pak/utoc index of every mod added or changed since its last read."""
+        if self._asset_task is not None:
+            self._assets_stale = True
+            return
+        entries = [(p["id"], p.get("path", ""), p.get("assets_mtime_ns")) for p in self.projects.values()]
+        task = AssetIndexTask(entries)
+        task.signals.finished.connect(self._on_asset_lists_read)
+        self._asset_task = task  # Keeps the signal object alive until delivery
+        self.task_pool.start(task)
+
+    def _on_asset_lists_read(self, results):
+        self._asset_task = None
+        changed = []
+        for project_id, (assets, mtime_ns) in results.items():
+            project_data = self.projects.get(project_id)
+            if project_data is None:
+                continue
+            project_data["assets"] = assets
+            project_data["assets_mtime_ns"] = mtime_ns
+            changed.append(project_data)
+        if changed:
+            self.store.put_many(changed)
+            self._update_conflicts(changed)
+        if self._assets_stale:
+            self._assets_stale = False
+            self.update_asset_lists()
+
+    # --- Asset Conflicts ---
+    def _rebuild_conflicts(self):
+        """Indexes the assets of every enabled mod from scratch."""
+        with_assets = [p for p in self.projects.values() if p.get("assets")]
+        self.status_cache.ensure_scanned({os.path.dirname(p.get("path", "")) for p in with_assets})
+        self.conflict_index.build(
+            (p["id"], p["assets"]) for p in with_assets
+            if self.status_cache.status(p.get("path", "")).state == STATUS_ENABLED)
+
+    def _update_conflicts(self, records):
+        """Re-enters ``records`` after their enabled state or asset list changed."""
+        affected = set()
+        for project_data in records:
+            enabled = self.status_cache.status(project_data.get("path", "")).state == STATUS_ENABLED
+            affected |= self.conflict_index.set_assets(
+                project_data["id"], project_data.get("assets") if enabled else ())
+        self._on_conflicts_changed(affected)
+
+    def _on_conflicts_changed(self, record_ids):
+        self.tree_model.refresh_records(record_ids)
+        current = self._current_project()
+        if current is not None and self.details_frame.isVisible():
+            self._show_conflicts(current)
+
+    # --- Library Reconciliation ---
+    def rescan_library(self, quiet=False):
+        """Compares the storage path with the catalog in the background.
+
+        With ``quiet`` (the startup scan) nothing is shown unless differences were found.
+        """
+        if self._library_scan is not None:
+            return
+        self.rescan_btn.setEnabled(False)
+        self._start_library_scan(None, quiet)
+
+    def _start_library_scan(self, directories, quiet):
+        records = [dict(project_data) for project_data in self.projects.values()]
+        task = LibraryScanTask(self.storage_path, records, self.hash_cache, directories)
+        watch = directories is not None
+        task.signals.finished.connect(
+            lambda result: self._on_library_scan_finished(result, quiet, watch, directories))
+        task.signals.failed.connect(lambda error: self._on_library_scan_failed(error, quiet))
+        self._library_scan = task  # Keeps the signal object alive until delivery
+        self.task_pool.start(task)
+
+    def _on_library_scan_failed(self, error, quiet):
+        self._library_scan = None
+        self.rescan_btn.setEnabled(True)
+        if not quiet:
+            QMessageBox.critical(self, tr("error_title"), error)
+
+    def _on_library_scan_finished(self, result, quiet, watch=False, directories=None):
+        self._library_scan = None
+        self.rescan_btn.setEnabled(True)
+        missing_paths = [p.get("path", "") for p in result.missing]
+        missing_paths.extend(p.get("path", "") for p, _ in result.moved)
+        self.status_cache.fill(result.scanned, missing_paths, directories)
+        if directories is None:
+            self._rebuild_conflicts()
+        else:
+            # A watcher rescan follows every toggle; only the rescanned folders can have changed.
+            self._update_conflicts(records_in(self.projects.values(), directories))
+        self.tree_model.refresh_status()
+        if watch:
+            # Missing files may come back (e.g. during a game update), so the
+            # watcher never drops records; a manual rescan does.
+            self._apply_library_scan(result, remove_missing=False)
+            self._update_details_panel(self._current_project())
+            return
+        if result.is_empty():
+            if not quiet:
+                QMessageBox.information(self, tr("library_scan_title"), tr("library_scan_clean"))
+            return
+        if LibraryScanDialog(result, self).exec_() == QDialog.Accepted:
+            self._apply_library_scan(result)
+
+    def _apply_library_scan(self, result, remove_missing=True):
+        """Writes a scan result to the catalog as one batch and patches the affected tree rows.
+
+        The scan ran on a snapshot, so every change is checked against the
+        current catalog and the disk before it is applied.
+        """
+        known_paths = {p.get("path", "").replace(DISABLED_EXT, '') for p in self.projects.values()}
+        changed, deleted, added = [], [], []
+        for snapshot, mod in result.moved:
+            project_data = self.projects.get(snapshot["id"])
+            if project_data is None or existing_mod_file(project_data.get("path", "")) \
+                    or mod.path in known_paths or not existing_mod_file(mod.path):
+                continue
+            recategorized = (mod.category1, mod.category2) != (None, None) and \
+                self.tree_model.categories_of(project_data) != (
+                    mod.category1 or project_data.get("category1"),
+                    mod.category2 or project_data.get("category2"))
+            if recategorized:
+                self.tree_model.remove_record(project_data)
+            project_data["path"] = mod.path
+            project_data["size"] = mod.size
+            project_data["mtime_ns"] = mod.mtime_ns
+            if mod.category1 is not None:
+                project_data["category1"] = mod.category1
+            if mod.category2 is not None:
+                project_data["category2"] = mod.category2
+            known_paths.add(mod.path)
+            self.dup_index.add_record(project_data)
+            changed.append(project_data)
+            if recategorized:
+                added.append(project_data)
+            else:
+                self.tree_model.update_record(project_data)
+        for snapshot in result.missing if remove_missing else ():
+            project_data = self.projects.get(snapshot["id"])
+            if project_data is None or existing_mod_file(project_data.get("path", "")):
+                continue
+            del self.projects[project_data["id"]]
+            self.dup_index.remove(project_data["id"])
+            self.tree_model.remove_record(project_data)
+            deleted.append(project_data)
+        for mod in result.added:
+            if mod.path in known_paths or not existing_mod_file(mod.path):
+                continue
+            file_name = os.path.basename(mod.path)
+            project_data = {
+                "id": new_record_id(),
+                "name": os.path.splitext(file_name)[0], "path": mod.path,
+                "note": tr("original_file") + f" {file_name}", "image_path": "",
+                "category1": mod.category1 or tr("tree_uncategorized"),
+                "category2": mod.category2 or tr("tree_default"),
+                "size": mod.size, "mtime_ns": mod.mtime_ns,
+            }
+            known_paths.add(mod.path)
+            self.projects[project_data["id"]] = project_data
+            self.dup_index.add_record(project_data)
+            changed.append(project_data)
+            added.append(project_data)
+        if not changed and not deleted:
+            return
+        self.store.put_many(changed, deleted)
+        self.tree_model.add_records(added)
+        self._update_conflicts(changed)
+        self._update_details_panel(self._current_project())
+        self.update_asset_lists()
+
+    # --- Storage Watcher ---
+    def _watch_storage(self):
+        """Watches the storage path and every folder below it for changes."""
+        watched = self.storage_watcher.directories()
+        if watched:
+            self.storage_watcher.removePaths(watched)
+        self._dirty_dirs.clear()
+        if os.path.isdir(self.storage_path):
+            self.storage_watcher.addPaths([self.storage_path] + list_directories(self.storage_path))
+
+    def _on_storage_changed(self, path):
+        # Bursts (an updater replacing many files) are coalesced into one rescan.
+        self._dirty_dirs.add(path)
+        self._watch_timer.start()
+
+    def _flush_storage_changes(self):
+        """Rescans the folders that changed since the last flush."""
+        if self._imports or self._library_scan is not None or self._rename_task is not None:
+            # Half-finished imports would look like new mods; try again once they are done.
+            self._watch_timer.start()
+            return
+        directories = set()
+        watched = set(self.storage_watcher.directories())
+        for path in self._dirty_dirs:
+            if not os.path.isdir(path):
+                directories.add(path)  # Removed folder: its records are reported missing
+                continue
+            directories.add(path)
+            # New folders start being watched and are scanned right away.
+            new_dirs = [d for d in list_directories(path) if d not in watched]
+            if new_dirs:
+                self.storage_watcher.addPaths(new_dirs)
+                directories.update(new_dirs)
+        self._dirty_dirs.clear()
+        if directories:
+            self._start_library_scan(sorted(directories), quiet=True)
+
+    def _update_import_status(self):
+        """Shows combined progress and throughput of all running imports."""
+        if not self._imports:
+            self.import_frame.setVisible(False)
+            return
+        done = self._import_finished_bytes + sum(state["done"] for state in self._imports.values())
+        total = self._import_finished_bytes + sum(state["total"] for state in self._imports.values())
+        elapsed = max(time.monotonic() - self._import_started_at, 1e-3)
+        self.import_progress.setValue(int(1000 * done / total) if total else 0)
+        self.import_status_label.setText(tr(
+            "import_progress", count=len(self._imports),
+            done=done / 2**20, total=total / 2**20, speed=done / 2**20 / elapsed))
+        self.import_frame.setVisible(True)
         
     def delete_project(self):
-        current_item = self.project_tree.currentItem()
-        if not current_item or current_item.data(0, Qt.UserRole) is None:
+        project_data = self._current_project()
+        if project_data is None:
             QMessageBox.warning(self, tr("warning_title"), tr("warning_select_mod"))
             return
-        project_index = current_item.data(0, Qt.UserRole)
-        project_data = self.projects[project_index]
+        if self._rename_task is not None:
+            QMessageBox.warning(self, tr("warning_title"), tr("warning_rename_busy"))
+            return
         reply = QMessageBox.question(self, tr("confirm_delete"),
             tr("confirm_delete_desc", name=project_data['name']),
             QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         if reply == QMessageBox.Yes:
             file_path = project_data.get('path', '')
-            enabled_path = file_path.replace(DISABLED_EXT, '')
-            disabled_path = enabled_path + DISABLED_EXT
+            # Files go to a hidden trash folder on the same volume so the delete can be undone.
+            trash_dir = os.path.join(self.storage_path, TRASH_DIR, new_record_id())
+            pairs = trash_pairs(file_path, trash_dir)
             try:
-                if os.path.exists(enabled_path): os.remove(enabled_path)
-                if os.path.exists(disabled_path): os.remove(disabled_path)
+                if pairs:
+                    os.makedirs(trash_dir, exist_ok=True)
+                done = rename_mod_sets([[pair] for pair in pairs], journal=self.rename_journal)
             except OSError as e:
+                self.status_cache.invalidate(file_path)
                 QMessageBox.critical(self, tr("error_title"), 
                                    tr("error_delete_file", error=str(e)))
                 return
-            self.projects.pop(project_index)
-            self.save_projects()
-            self._populate_tree()
-            self._update_details_panel(None)
+            self.status_cache.invalidate(file_path)
+            del self.projects[project_data["id"]]
+            self.dup_index.remove(project_data["id"])
+            self.store.delete(project_data)
+            self.tree_model.remove_record(project_data)
+            self._on_conflicts_changed(self.conflict_index.remove(project_data["id"]))
+            self._push_undo(tr("undo_delete", name=project_data.get("name", "")), done,
+                            deleted=[project_data], trash_dir=trash_dir if pairs else None)
+            self._update_details_panel(self._current_project())
 
     def save_current_project_details(self):
-        current_item = self.project_tree.currentItem()
-        if not current_item or current_item.data(0, Qt.UserRole) is None: return
-        project_index = current_item.data(0, Qt.UserRole)
-        project_data = self.projects[project_index]
+        project_data = self._current_project()
+        if project_data is None: return
         project_data["name"] = self.details_name_edit.text()
         project_data["note"] = self.details_note_edit.toPlainText()
-        self.save_projects()
-        current_item.setText(0, project_data["name"])
+        self._save_project(project_data)
+        self.tree_model.update_record(project_data)
         QMessageBox.information(self, tr("message_saved"), tr("message_saved_desc"))
 
+    # --- Batch Enable/Disable ---
+    def _show_tree_menu(self, pos):
+        index = self.project_tree.indexAt(pos)
+        if not index.isValid():
+            return
+        menu = QMenu(self)
+        source_index = self.tree_proxy.mapToSource(index)
+        if self.tree_model.record(source_index) is None:
+            records = self.tree_model.records_under(source_index)
+            matches = self.tree_proxy.matches()
+            if matches is not None:
+                # A filtered category only acts on the mods it shows.
+                records = [record for record in records if record["id"] in matches]
+            enable_text, disable_text = tr("menu_enable_category"), tr("menu_disable_category")
+        else:
+            records = [self.projects[project_id] for project_id in self._selected_project_ids()]
+            enable_text, disable_text = tr("menu_enable_selected"), tr("menu_disable_selected")
+        menu.addAction(enable_text, lambda: self.set_projects_enabled(records, True))
+        menu.addAction(disable_text, lambda: self.set_projects_enabled(records, False))
+        menu.setEnabled(self._rename_task is None)
+        menu.exec_(self.project_tree.viewport().mapToGlobal(pos))
+
+    def _selected_project_ids(self):
+        ids = (index.data(Qt.UserRole) for index in self.project_tree.selectionModel().selectedRows())
+        return [project_id for project_id in ids if project_id in self.projects]
+
+    def set_projects_enabled(self, records, enable):
+        """Renames every mod in ``records`` that is not yet in the wanted state, on a worker.
+
+        The batch either completes or is rolled back entirely; the tree is
+        repainted once when it is done.
+        """
+        self._start_renames([(project_data, enable) for project_data in records])
+
+    def _start_renames(self, changes, report=False, max_workers=1):
+        """Starts one RenameTask for the ``(record, enable)`` pairs that need a rename.
+
+        Returns False if another batch is still running.
+        """
+        if self._rename_task is not None:
+            return False
+        self.status_cache.ensure_scanned({os.path.dirname(p.get("path", "")) for p, _ in changes})
+        changing = []
+        for project_data, enable in changes:
+            state = self.status_cache.status(project_data.get("path", "")).state
+            if state != STATUS_MISSING and (state == STATUS_ENABLED) != enable:
+                changing.append((project_data, enable))
+        if not changing and not report:
+            return True
+        task = RenameTask([toggle_pairs(p["path"], enable) for p, enable in changing],
+                          self.rename_journal, max_workers)
+        task.signals.finished.connect(
+            lambda done, elapsed: self._on_rename_finished(changing, done, elapsed, report))
+        task.signals.failed.connect(lambda error: self._on_rename_failed([p for p, _ in changing], error))
+        self._rename_task = task  # Keeps the signal object alive until delivery
+        self.task_pool.start(task)
+        return True
+
+    def _on_rename_finished(self, changes, done, elapsed, report):
+        self._rename_task = None
+        for project_data, enable in changes:
+            self.status_cache.set_state(project_data["path"], STATUS_ENABLED if enable else STATUS_DISABLED)
+        self._update_conflicts([project_data for project_data, _ in changes])
+        self.tree_model.refresh_status()
+        self._update_details_panel(self._current_project())
+        if done:
+            self._push_undo(tr("undo_batch", count=len(changes)), done)
+        if report:
+            QMessageBox.information(self, tr("profile_applied_title"),
+                                    tr("profile_applied", mods=len(changes), files=len(done), seconds=elapsed))
+
+    def _on_rename_failed(self, records, error):
+        self._rename_task = None
+        for project_data in records:
+            self.status_cache.invalidate(project_data["path"])
+        self._update_conflicts(records)
+        self.tree_model.refresh_status()
+        self._update_details_panel(self._current_project())
+        QMessageBox.critical(self, tr("error_title"), tr("error_rename_file", error=error))
+
+    # --- Load Order ---
+    def edit_load_order(self):
+        """Lets the user reorder the mods, then renames as few of them as possible on a worker.
+
+        The game loads paks in file name order, so the order is kept in
+        numeric file name prefixes.
+        """
+        if self._rename_task is not None:
+            return
+        records = [p for p in self.projects.values() if p.get("path")]
+        self.status_cache.ensure_scanned({os.path.dirname(p["path"]) for p in records})
+        records = [p for p in records if self.status_cache.status(p["path"]).state != STATUS_MISSING]
+        records.sort(key=lambda p: load_order_key(p["path"]))
+        dialog = LoadOrderDialog(records, self.tree_model.categories_of, self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        by_path = {p["path"]: p for p in records}
+        ordered = [self.projects[project_id] for project_id in dialog.order()]
+        changes = plan_load_order([(p["path"], p.get(LOAD_ORDER_FIELD)) for p in ordered])
+        if not changes:
+            return
+        try:
+            jobs = load_order_jobs(changes)
+        except OSError as e:
+            QMessageBox.critical(self, tr("error_title"), tr("error_rename_file", error=str(e)))
+            return
+        moves = [(by_path[old_path], new_path, prefix) for old_path, new_path, prefix in changes]
+        task = RenameTask(jobs, self.rename_journal)
+        task.signals.finished.connect(lambda done, elapsed: self._on_load_order_finished(moves, done))
+        task.signals.failed.connect(lambda error: self._on_rename_failed([p for p, _, _ in moves], error))
+        self._rename_task = task  # Keeps the signal object alive until delivery
+        self.task_pool.start(task)
+
+    def _move_projects(self, moves):
+        """Points each record of ``(record, new path, load order prefix)`` at its renamed files."""
+        for project_data, new_path, prefix in moves:
+            self.status_cache.invalidate(project_data["path"])
+            self.status_cache.invalidate(new_path)
+            project_data["path"] = new_path
+            if prefix is None:
+                project_data.pop(LOAD_ORDER_FIELD, None)
+            else:
+                project_data[LOAD_ORDER_FIELD] = prefix
+            self.dup_index.add_record(project_data)
+            self.tree_model.update_record(project_data)
+        self.store.put_many([project_data for project_data, _, _ in moves])
+
+    def _on_load_order_finished(self, moves, done):
+        self._rename_task = None
+        old_paths = {project_data["id"]: (project_data["path"], project_data.get(LOAD_ORDER_FIELD))
+                     for project_data, _, _ in moves}
+        self._move_projects(moves)
+        self.tree_model.refresh_status()
+        self._update_details_panel(self._current_project())
+        self._push_undo(tr("undo_load_order", count=len(moves)), done, paths=old_paths)
+
+    # --- Rename Journal and Undo ---
+    def _recover_renames(self):
+        """Rolls back or finishes a rename batch that a crash interrupted."""
+        if self.rename_journal.pending() is None:
+            return
+        reply = QMessageBox.question(self, tr("rename_recovery_title"), tr("rename_recovery_desc"),
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+        try:
+            self.rename_journal.recover(resume=reply == QMessageBox.No)
+        except OSError as e:
+            QMessageBox.critical(self, tr("error_title"), tr("error_rename_file", error=str(e)))
+            return
+        # The undo stack did not survive the crash, so trashed files cannot come back.
+        shutil.rmtree(os.path.join(self.storage_path, TRASH_DIR), ignore_errors=True)
+
+    def _push_undo(self, label, renames, deleted=(), trash_dir=None, paths=None):
+        # ``paths`` maps the ids of renamed mods to their catalog path and load
+        # order prefix before the rename.
+        self.undo_stack.append({"label": label, "renames": list(renames),
+                                "deleted": list(deleted), "trash_dir": trash_dir,
+                                "paths": dict(paths or {})})
+        while len(self.undo_stack) > UNDO_LIMIT:
+            dropped = self.undo_stack.pop(0)
+            if dropped["trash_dir"]:
+                shutil.rmtree(dropped["trash_dir"], ignore_errors=True)
+        self._update_undo_button()
+
+    def _update_undo_button(self):
+        self.undo_btn.setEnabled(bool(self.undo_stack))
+        self.undo_btn.setToolTip(self.undo_stack[-1]["label"] if self.undo_stack else "")
+
+    def undo_last(self):
+        """Reverses the most recent enable/disable, delete or load order change."""
+        if self._rename_task is not None or not self.undo_stack:
+            return
+        entry = self.undo_stack.pop()
+        self._update_undo_button()
+        task = RenameTask([[(dst, src)] for src, dst in reversed(entry["renames"])], self.rename_journal)
+        task.signals.finished.connect(lambda done, elapsed: self._on_undo_finished(entry))
+        task.signals.failed.connect(lambda error: self._on_undo_failed(entry, error))
+        self._rename_task = task  # Keeps the signal object alive until delivery
+        self.task_pool.start(task)
+
+    def _on_undo_finished(self, entry):
+        self._rename_task = None
+        for src, _ in entry["renames"]:
+            self.status_cache.invalidate(src)
+        if entry["deleted"]:
+            for project_data in entry["deleted"]:
+                self.projects[project_data["id"]] = project_data
+                self.dup_index.add_record(project_data)
+            self.store.put_many(entry["deleted"])
+            self.tree_model.add_records(entry["deleted"])
+        moved = [(self.projects[project_id], path, prefix)
+                 for project_id, (path, prefix) in entry["paths"].items() if project_id in self.projects]
+        if moved:
+            self._move_projects(moved)
+        if entry["trash_dir"]:
+            shutil.rmtree(entry["trash_dir"], ignore_errors=True)
+        self._rebuild_conflicts()
+        self.tree_model.refresh_status()
+        self._update_details_panel(self._current_project())
+
+    def _on_undo_failed(self, entry, error):
+        self._rename_task = None
+        self.undo_stack.append(entry)
+        self._update_undo_button()
+        QMessageBox.critical(self, tr("error_title"), tr("error_rename_file", error=error))
+
+    # --- Profiles ---
+    def _reload_profiles(self, current=None):
+        current = current or self.profile_combo.currentText()
+        self.profile_combo.clear()
+        self.profile_combo.addItems(sorted(self.store.profiles()))
+        index = self.profile_combo.findText(current)
+        if index >= 0:
+            self.profile_combo.setCurrentIndex(index)
+
+    def save_profile(self):
+        """Saves the mods that are enabled right now as a named profile."""
+        name, ok = QInputDialog.getText(self, tr("button_save_profile"), tr("profile_name_prompt"),
+                                        text=self.profile_combo.currentText())
+        name = name.strip()
+        if not ok or not name:
+            return
+        if name in self.store.profiles():
+            reply = QMessageBox.question(self, tr("button_save_profile"),
+                tr("profile_overwrite", name=name), QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+        self.status_cache.ensure_scanned({os.path.dirname(p.get("path", "")) for p in self.projects.values()})
+        enabled_ids = [project_id for project_id, project_data in self.projects.items()
+                       if self.status_cache.status(project_data.get("path", "")).state == STATUS_ENABLED]
+        self.store.put_profile(name, enabled_ids)
+        self._reload_profiles(name)
+
+    def apply_profile(self):
+        """Enables exactly the mods of the selected profile, renaming only what differs."""
+        name = self.profile_combo.currentText()
+        record_ids = self.store.profiles().get(name)
+        if record_ids is None:
+            return
+        enabled_ids = set(record_ids)
+        changes = [(project_data, project_id in enabled_ids)
+                   for project_id, project_data in self.projects.items()]
+        self._start_renames(changes, report=True, max_workers=RENAME_WORKERS)
+
+    def delete_profile(self):
+        name = self.profile_combo.currentText()
+        if not name:
+            return
+        reply = QMessageBox.question(self, tr("button_delete_profile"), tr("profile_delete_confirm", name=name),
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            self.store.delete_profile(name)
+            self._reload_profiles()
+
+    def _on_tree_enable_requested(self, project_id, enable):
+        self.toggle_project_enabled(project_id, enable)
+        if project_id == self._current_project_id():
+            self._update_details_panel(self.projects.get(project_id))
+
     def _on_enable_changed(self, state):
-        file_path = self.details_frame.property("current_project_path")
-        if not file_path: return
-        self.toggle_project_enabled(file_path, bool(state))
-        project_index = self.project_tree.currentItem().data(0, Qt.UserRole)
-        self._update_details_panel(self.projects[project_index])
+        project_id = self.details_frame.property("current_project_id")
+        if not project_id: return
+        self.toggle_project_enabled(project_id, bool(state))
+        self._update_details_panel(self.projects.get(project_id))
         
     def change_image(self):
-        current_item = self.project_tree.currentItem()
-        if not current_item or current_item.data(0, Qt.UserRole) is None:
+        project_data = self._current_project()
+        if project_data is None:
             QMessageBox.warning(self, tr("warning_title"), tr("warning_select_before_image"))
             return
         file_path, _ = QFileDialog.getOpenFileName(self, tr("select_image_title"), "", tr("file_filter_images"))
@@ -655,24 +2418,37 @@ class ProjectManagerWindow(QMainWindow):
             QMessageBox.critical(self, tr("error_copy_image"), 
                                tr("error_copy_image_desc", error=str(e)))
             return
-        project_index = current_item.data(0, Qt.UserRole)
-        project_data = self.projects[project_index]
+        self.thumbnails.forget(dest_path)
         project_data["image_path"] = dest_path
+        self._save_project(project_data)
         self._update_details_panel(project_data)
         
-    @staticmethod
-    def toggle_project_enabled(file_path, enable):
+    def toggle_project_enabled(self, project_id, enable):
+        project_data = self.projects.get(project_id)
+        if project_data is None or self._rename_task is not None: return
+        file_path = project_data.get("path")
         if not file_path: return
-        enabled_path = file_path.replace(DISABLED_EXT, '')
-        disabled_path = enabled_path + DISABLED_EXT
+        target_state = STATUS_ENABLED if enable else STATUS_DISABLED
+        if self.status_cache.status(file_path).state == target_state:
+            return
         try:
-            if enable and os.path.exists(disabled_path):
-                os.rename(disabled_path, enabled_path)
-            elif not enable and os.path.exists(enabled_path):
-                os.rename(enabled_path, disabled_path)
+            # The .pak and its IoStore companions are always switched together.
+            done = rename_mod_sets([toggle_pairs(file_path, enable)], journal=self.rename_journal)
+        except FileNotFoundError:
+            # The cached state was stale; the next lookup reads the disk.
+            self.status_cache.invalidate(file_path)
+            self.tree_model.update_record(project_data)
+            return
         except OSError as e:
-            QMessageBox.critical(None, tr("error_title"), 
+            self.status_cache.invalidate(file_path)
+            self.tree_model.update_record(project_data)
+            QMessageBox.critical(self, tr("error_title"), 
                                tr("error_rename_file", error=str(e)))
+            return
+        self.status_cache.set_state(file_path, target_state)
+        self.tree_model.update_record(project_data)
+        self._update_conflicts([project_data])
+        self._push_undo(tr("undo_toggle", name=project_data.get("name", "")), done)
 
 # --- Application Entry Point ---
 def main():
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+"""
+Asset listings of Unreal Engine .pak and IoStore (.utoc) files.
+
+Only the parts of a file that name its assets are read: the .pak footer at
+the very end, the index it points to, and the header and directory index at
+the start of a .utoc. The file is memory-mapped, so the payload of a
+multi-gigabyte mod is never touched.
+
+Supported layouts:
+
+* .pak versions 1-9, whose index lists every file name with its entry.
+* .pak versions 10 and later, whose names live in a separate full
+  directory index. Files written with only the path hash index store no
+  names and raise PakIndexError.
+* .utoc files with a directory index (version 2 and later). Older
+  containers have no file names; they yield an empty list.
+
+Encrypted indexes cannot be read without the game's key and raise
+PakIndexError.
+
+Asset paths are returned relative to the game root with forward slashes,
+e.g. ``SnowBreak/Content/Character/Body.uasset``; the ``../../../`` mount
+point prefix is dropped.
+"""
+
+import mmap
+import os
+import struct
+
+from file_ops import DISABLED_EXT, existing_mod_file, mod_file_paths
+
+PAK_MAGIC = 0x5A6F12E1
+PAK_FOOTER_SEARCH = 1024  # Bytes at the end of a .pak searched for the footer
+PAK_VERSION_PATH_HASH_INDEX = 10
+UTOC_MAGIC = b"-==--==--==--==-"
+UTOC_VERSION_DIRECTORY_INDEX = 2
+UTOC_VERSION_PERFECT_HASH = 4
+UTOC_VERSION_PERFECT_HASH_WITH_OVERFLOW = 5
+UTOC_FLAG_ENCRYPTED = 0x02
+UTOC_FLAG_SIGNED = 0x04
+UTOC_FLAG_INDEXED = 0x08
+
+_UTOC_HEADER = struct.Struct("<16sBBHIIIIIIIIIQ16sBBHIQII40x")
+_NO_INDEX = 0xFFFFFFFF
+
+
+class PakIndexError(Exception):
+    """The file is not a readable .pak or .utoc, or its index is encrypted."""
+
+
+class _Reader:
+    """Little-endian reads from a bytes-like buffer, with bounds checks."""
+
+    def __init__(self, data, pos=0):
+        self.data = data
+        self.pos = pos
+
+    def _take(self, size):
+        if size < 0 or self.pos + size > len(self.data):
+            raise PakIndexError("index is truncated or damaged")
+        start = self.pos
+        self.pos += size
+        return start
+
+    def skip(self, size):
+        self._take(size)
+
+    def bytes(self, size):
+        start = self._take(size)
+        return bytes(self.data[start:start + size])
+
+    def _unpack(self, fmt, size):
+        return struct.unpack_from(fmt, self.data, self._take(size))[0]
+
+    def u8(self):
+        return self._unpack("<B", 1)
+
+    def u32(self):
+        return self._unpack("<I", 4)
+
+    def i32(self):
+        return self._unpack("<i", 4)
+
+    def i64(self):
+        return self._unpack("<q", 8)
+
+    def count(self, item_size):
+        """Read an array length, rejecting lengths the remaining data cannot hold."""
+        count = self.i32()
+        if count < 0 or count * item_size > len(self.data) - self.pos:
+            raise PakIndexError("index is truncated or damaged")
+        return count
+
+    def fstring(self):
+        """Read an FString: a signed length, then ANSI bytes or (if negative) UTF-16 units."""
+        length = self.i32()
+        if length == 0:
+            return ""
+        if length > 0:
+            text = self.bytes(length).decode("utf-8", errors="replace")
+        else:
+            text = self.bytes(-length * 2).decode("utf-16-le", errors="replace")
+        return text.rstrip("\0")
+
+
+def _asset_path(mount_point, relative_path):
+    path = (mount_point + relative_path).replace("\\", "/")
+    while path.startswith("../"):
+        path = path[3:]
+    return path.lstrip("/")
+
+
+def _read_ranges(path, ranges_for):
+    """Map ``path`` and return ``ranges_for(size, read)``; ``read(offset, size)`` returns bytes."""
+    with open(path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            mapped = None
+        if mapped is not None:
+            with mapped:
+                return ranges_for(file_size, lambda offset, size: mapped[offset:offset + size])
+
+        def read(offset, size):
+            f.seek(offset)
+            return f.read(size)
+        return ranges_for(file_size, read)
+
+
+# --- .pak ---
+def _find_pak_footer(tail):
+    """Return ``(version, index_offset, index_size, compression_slots)``.
+
+    The footer layout grew over the versions, so the magic number is looked
+    for from the end and accepted where the bytes after it match a known size.
+    """
+    pos = tail.rfind(struct.pack("<I", PAK_MAGIC))
+    while pos > 0:
+        version, index_offset, index_size = struct.unpack_from("<iqq", tail, pos + 4)
+        after = len(tail) - pos
+        frozen = 1 if version == 9 else 0  # Only version 9 stores the frozen index flag
+        slots = (0, 4, 5) if version >= 8 else (0,)
+        for slot_count in slots:
+            if after == 44 + frozen + 32 * slot_count:
+                # The encrypted index flag precedes the magic from version 4 on.
+                if version >= 4 and tail[pos - 1]:
+                    raise PakIndexError("the .pak index is encrypted")
+                if frozen and tail[pos + 44]:
+                    raise PakIndexError("frozen .pak indexes are not supported")
+                return version, index_offset, index_size, slot_count
+        pos = tail.rfind(struct.pack("<I", PAK_MAGIC), 0, pos)
+    raise PakIndexError("not a .pak file")
+
+
+def _legacy_pak_assets(index, version, compression_slots):
+    reader = _Reader(index)
+    mount_point = reader.fstring()
+    assets = []
+    for _ in range(reader.count(4)):
+        name = reader.fstring()
+        reader.skip(24)  # Offset, size, uncompressed size
+        # 4.22 paks (4 compression slots) store the compression method in one byte.
+        compression = reader.u8() if version == 8 and compression_slots == 4 else reader.u32()
+        if version <= 1:
+            reader.skip(8)  # Timestamp
+        reader.skip(20)  # SHA-1
+        if version >= 3:
+            if compression:
+                reader.skip(16 * reader.count(16))  # Compression blocks
+            reader.skip(5)  # Flags, compression block size
+        assets.append(_asset_path(mount_point, name))
+    return assets
+
+
+def _pak_directory_assets(index, read, file_size):
+    reader = _Reader(index)
+    mount_point = reader.fstring()
+    reader.skip(4 + 8)  # Entry count, path hash seed
+    if reader.u32():
+        reader.skip(8 + 8 + 20)  # Path hash index offset, size, hash
+    if not reader.u32():
+        raise PakIndexError("the .pak has no directory index")
+    directory_offset, directory_size = reader.i64(), reader.i64()
+    if directory_offset < 0 or directory_size < 0 or directory_offset + directory_size > file_size:
+        raise PakIndexError("index is truncated or damaged")
+    reader = _Reader(read(directory_offset, directory_size))
+    assets = []
+    for _ in range(reader.count(8)):
+        directory = reader.fstring().lstrip("/")
+        for _ in range(reader.count(8)):
+            name = reader.fstring()
+            reader.skip(4)  # Encoded entry offset
+            assets.append(_asset_path(mount_point, directory + name))
+    return assets
+
+
+def read_pak_assets(path):
+    """Return the asset paths stored in the .pak at ``path``.
+
+    Raises:
+        PakIndexError: Not a .pak, the index is encrypted or frozen, or it has no names.
+        OSError: The file could not be read.
+    """
+    def parse(file_size, read):
+        tail_size = min(PAK_FOOTER_SEARCH, file_size)
+        tail = read(file_size - tail_size, tail_size)
+        version, index_offset, index_size, slots = _find_pak_footer(tail)
+        if index_offset < 0 or index_size < 0 or index_offset + index_size > file_size:
+            raise PakIndexError("index is truncated or damaged")
+        index = read(index_offset, index_size)
+        if version >= PAK_VERSION_PATH_HASH_INDEX:
+            return _pak_directory_assets(index, read, file_size)
+        return _legacy_pak_assets(index, version, slots)
+    try:
+        return _read_ranges(path, parse)
+    except struct.error as e:
+        raise PakIndexError(str(e)) from e
+
+
+# --- .utoc ---
+def _utoc_directory_offset(header, version):
+    """Return the offset of the directory index: it follows the header and every table before it."""
+    (_, _, _, _, header_size, entry_count, block_count, block_entry_size, method_count,
+     method_length, _, _, _, _, _, flags, _, _, seed_count, _, overflow_count, _) = header
+    offset = header_size + entry_count * (12 + 10)  # Chunk ids, offsets and lengths
+    if version >= UTOC_VERSION_PERFECT_HASH:
+        offset += seed_count * 4
+    if version >= UTOC_VERSION_PERFECT_HASH_WITH_OVERFLOW:
+        offset += overflow_count * 4
+    offset += block_count * block_entry_size + method_count * method_length
+    return offset, bool(flags & UTOC_FLAG_SIGNED), block_count
+
+
+def read_utoc_assets(path):
+    """Return the file paths in the directory index of the .utoc at ``path``.
+
+    Raises:
+        PakIndexError: Not a .utoc, or the directory index is encrypted.
+        OSError: The file could not be read.
+    """
+    def parse(file_size, read):
+        header = _UTOC_HEADER.unpack(read(0, _UTOC_HEADER.size).ljust(_UTOC_HEADER.size, b"\0"))
+        magic, version, flags, directory_size = header[0], header[1], header[15], header[11]
+        if magic != UTOC_MAGIC:
+            raise PakIndexError("not a .utoc file")
+        if version < UTOC_VERSION_DIRECTORY_INDEX or not flags & UTOC_FLAG_INDEXED or not directory_size:
+            return []
+        if flags & UTOC_FLAG_ENCRYPTED:
+            raise PakIndexError("the .utoc directory index is encrypted")
+        offset, signed, block_count = _utoc_directory_offset(header, version)
+        if signed:
+            hash_size = struct.unpack("<i", read(offset, 4))[0]
+            offset += 4 + 2 * hash_size + 20 * block_count
+        if offset + directory_size > file_size:
+            raise PakIndexError("index is truncated or damaged")
+        return _utoc_directory_assets(read(offset, directory_size))
+    try:
+        return _read_ranges(path, parse)
+    except struct.error as e:
+        raise PakIndexError(str(e)) from e
+
+
+def _utoc_directory_assets(data):
+    reader = _Reader(data)
+    mount_point = reader.fstring()
+    directories = [(reader.u32(), reader.u32(), reader.u32(), reader.u32())
+                   for _ in range(reader.count(16))]  # Name, first child, next sibling, first file
+    files = [(reader.u32(), reader.u32(), reader.u32())
+             for _ in range(reader.count(12))]  # Name, next file, user data
+    strings = [reader.fstring() for _ in range(reader.count(4))]
+
+    def name(index):
+        if index == _NO_INDEX or index >= len(strings):
+            raise PakIndexError("index is truncated or damaged")
+        return strings[index]
+
+    assets = []
+    pending = [(0, "")] if directories else []
+    visited = set()
+    while pending:
+        directory, prefix = pending.pop()
+        if directory in visited or directory >= len(directories):
+            raise PakIndexError("index is truncated or damaged")
+        visited.add(directory)
+        name_index, first_child, _, first_file = directories[directory]
+        if directory != 0 and name_index != _NO_INDEX:
+            prefix = f"{prefix}{name(name_index)}/"
+        file_index = first_file
+        while file_index != _NO_INDEX:
+            if file_index >= len(files):
+                raise PakIndexError("index is truncated or damaged")
+            file_name, file_index, _ = files[file_index]
+            assets.append(_asset_path(mount_point, prefix + name(file_name)))
+            if len(assets) > len(files):
+                raise PakIndexError("index is truncated or damaged")  # A cycle in the file list
+        child = first_child
+        while child != _NO_INDEX:
+            if child >= len(directories):
+                raise PakIndexError("index is truncated or damaged")
+            pending.append((child, prefix))
+            child = directories[child][2]
+            if len(pending) > len(directories):
+                raise PakIndexError("index is truncated or damaged")
+    return assets
+
+
+# --- Mod sets ---
+def read_mod_assets(path):
+    """Return the sorted asset paths of the mod set whose primary file is ``path``.
+
+    The .pak and, when present, its .utoc are both read, in their enabled or
+    disabled form.
+
+    Raises:
+        PakIndexError: A file of the set could not be parsed.
+        OSError: The primary file could not be read.
+    """
+    assets = set()
+    enabled_path = path.replace(DISABLED_EXT, '')
+    for i, file_path in enumerate(mod_file_paths(enabled_path)):
+        existing = existing_mod_file(file_path)
+        if existing is None:
+            if i == 0:
+                raise FileNotFoundError(path)
+            continue
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext == ".pak":
+            assets.update(read_pak_assets(existing))
+        elif ext == ".utoc":
+            assets.update(read_utoc_assets(existing))
+    return sorted(assets)
@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+"""
+Library reconciliation: compare the catalog with what is actually on disk.
+
+The storage path is laid out as ``<storage>/<category1>/<category2>/<mod files>``.
+The scanner lists it with ``os.scandir``, one worker per category directory,
+and reports mods that appeared on disk, catalog entries whose files are gone,
+and entries whose files were moved or renamed. No file is read unless two
+candidates for a move share the same size.
+
+:func:`scan_directories` rescans just the folders a file system watcher
+reported, so small changes do not need a walk of the whole library.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from file_ops import DISABLED_EXT, MOD_SET_EXTENSIONS, PARTIAL_SUFFIX, companion_paths
+
+SCAN_WORKERS = 8
+
+STATUS_ENABLED = "enabled"
+STATUS_DISABLED = "disabled"
+STATUS_MISSING = "missing"
+
+
+class ScannedMod:
+    """The primary file of a mod set, or any other file, found on disk."""
+    __slots__ = ("path", "disabled", "size", "mtime_ns", "inode", "category1", "category2")
+
+    def __init__(self, path, disabled, stat, category1, category2):
+        self.path = path  # Enabled path, without DISABLED_EXT
+        self.disabled = disabled
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.inode = stat.st_ino
+        self.category1 = category1
+        self.category2 = category2
+
+
+class ScanResult:
+    """Differences between the catalog and the storage path."""
+
+    def __init__(self, added=None, missing=None, moved=None, scanned=None):
+        self.added = added or []  # ScannedMod not in the catalog
+        self.missing = missing or []  # catalog records with no file on disk
+        self.moved = moved or []  # (record, ScannedMod) pairs
+        self.scanned = scanned or []  # every ScannedMod that was compared
+
+    def is_empty(self):
+        return not (self.added or self.missing or self.moved)
+
+
+def is_mod_file(path):
+    return os.path.splitext(path.replace(DISABLED_EXT, ''))[1].lower() in MOD_SET_EXTENSIONS
+
+
+def normalize_path(path):
+    return os.path.normcase(os.path.abspath(path.replace(DISABLED_EXT, '')))
+
+
+def _scan_dir(dir_path, category1, category2, recursive):
+    """List the mod sets in one directory; returns (mods, subdirectories).
+
+    Files of other types are listed on their own, since mods imported before
+    the catalog knew about mod sets may be any file.
+    """
+    stems = {}  # lowercase stem -> {ext: (enabled_path, disabled, stat)}
+    mods = []
+    subdirs = []
+    try:
+        entries = list(os.scandir(dir_path))
+    except OSError:
+        return [], []
+    for entry in entries:
+        name = entry.name
+        if name.startswith(".") or name.endswith(PARTIAL_SUFFIX):
+            continue
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry)
+                continue
+            if not entry.is_file():
+                continue
+        except OSError:
+            continue
+        disabled = name.endswith(DISABLED_EXT)
+        enabled_name = name[:-len(DISABLED_EXT)] if disabled else name
+        stem, ext = os.path.splitext(enabled_name)
+        ext = ext.lower()
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        if ext not in MOD_SET_EXTENSIONS:
+            mods.append(ScannedMod(os.path.join(dir_path, enabled_name), disabled, stat, category1, category2))
+            continue
+        stems.setdefault(stem.lower(), {})[ext] = (os.path.join(dir_path, enabled_name), disabled, stat)
+    for files in stems.values():
+        # The .pak represents the set; lone IoStore files are kept as they are.
+        primary_ext = next(ext for ext in MOD_SET_EXTENSIONS if ext in files)
+        path, disabled, stat = files[primary_ext]
+        mods.append(ScannedMod(path, disabled, stat, category1, category2))
+    if recursive:
+        for subdir in subdirs:
+            sub_mods, _ = _scan_dir(subdir.path, category1, category2, True)
+            mods.extend(sub_mods)
+    return mods, subdirs
+
+
+def scan_storage(storage_path, max_workers=SCAN_WORKERS):
+    """Return every mod set below ``storage_path`` as a list of ScannedMod.
+
+    Files directly in the storage path or in a category1 folder get ``None``
+    for the missing category levels; folders below category2 count towards it.
+    """
+    mods, cat1_dirs = _scan_dir(storage_path, None, None, False)
+    jobs = []
+    for cat1_dir in cat1_dirs:
+        cat1_mods, cat2_dirs = _scan_dir(cat1_dir.path, cat1_dir.name, None, False)
+        mods.extend(cat1_mods)
+        jobs.extend((cat2_dir.path, cat1_dir.name, cat2_dir.name) for cat2_dir in cat2_dirs)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for dir_mods, _ in pool.map(lambda job: _scan_dir(*job, True), jobs):
+            mods.extend(dir_mods)
+    return mods
+
+
+def list_directories(root):
+    """Return every folder below ``root`` (recursively), skipping hidden ones."""
+    directories = []
+    pending = [root]
+    while pending:
+        try:
+            entries = list(os.scandir(pending.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if not entry.name.startswith(".") and entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                    pending.append(entry.path)
+            except OSError:
+                continue
+    return directories
+
+
+def scan_directories(storage_path, directories):
+    """Return the mod sets directly inside ``directories``, without their subfolders.
+
+    Categories follow the folder's position below ``storage_path``, as in
+    :func:`scan_storage`.
+    """
+    storage_path = os.path.abspath(storage_path)
+    mods = []
+    for directory in directories:
+        rel_dir = os.path.relpath(os.path.abspath(directory), storage_path)
+        if rel_dir == os.curdir:
+            parts = []
+        elif rel_dir == os.pardir or rel_dir.startswith(os.pardir + os.sep):
+            continue
+        else:
+            parts = rel_dir.split(os.sep)
+        category1 = parts[0] if len(parts) >= 1 else None
+        category2 = parts[1] if len(parts) >= 2 else None
+        dir_mods, _ = _scan_dir(directory, category1, category2, False)
+        mods.extend(dir_mods)
+    return mods
+
+
+def records_in(records, directories):
+    """Return the records whose file lies directly in one of ``directories``."""
+    wanted = {os.path.normcase(os.path.abspath(directory)) for directory in directories}
+    return [record for record in records
+            if os.path.dirname(normalize_path(record.get("path", ""))) in wanted]
+
+
+def reconcile(records, scanned, hash_cache=None):
+    """Diff catalog ``records`` against ``scanned`` mods.
+
+    A missing record and a new file are treated as one moved mod when they have
+    the same size and either the same content hash (from the record and the
+    hash cache) or, when the record has no hash, the same file name.
+
+    Returns:
+        A ScanResult.
+    """
+    on_disk = {normalize_path(mod.path): mod for mod in scanned}
+    unmatched = []
+    for record in records:
+        path = record.get("path", "")
+        if on_disk.pop(normalize_path(path), None) is None:
+            unmatched.append(record)
+        # IoStore files left behind by a .pak that went missing are not new mods.
+        for companion in companion_paths(path.replace(DISABLED_EXT, '')):
+            on_disk.pop(normalize_path(companion), None)
+    new_by_size = {}
+    for mod in on_disk.values():
+        new_by_size.setdefault(mod.size, []).append(mod)
+
+    result = ScanResult(scanned=scanned)
+    for record in unmatched:
+        candidates = new_by_size.get(record.get("size"), [])
+        match = _find_move(record, candidates, hash_cache)
+        if match is None:
+            result.missing.append(record)
+        else:
+            candidates.remove(match)
+            result.moved.append((record, match))
+    # Other files only keep their records from going missing; they are not new mods.
+    result.added = [mod for mods in new_by_size.values() for mod in mods if is_mod_file(mod.path)]
+    return result
+
+
+def _find_move(record, candidates, hash_cache):
+    if not candidates:
+        return None
+    content_hash = record.get("content_hash")
+    if content_hash and hash_cache is not None:
+        for mod in candidates:
+            disk_path = mod.path + DISABLED_EXT if mod.disabled else mod.path
+            try:
+                if hash_cache.digest(disk_path) == content_hash:
+                    return mod
+            except OSError:
+                continue
+        return None
+    name = os.path.basename(record.get("path", "")).lower()
+    for mod in candidates:
+        if os.path.basename(mod.path).lower() == name:
+            return mod
+    return None
+
+
+class ModStatus:
+    """Last known state of a mod's primary file."""
+    __slots__ = ("state", "size", "mtime_ns")
+
+    def __init__(self, state, size=None, mtime_ns=None):
+        self.state = state
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+
+class StatusCache:
+    """In-memory enabled/disabled/missing state of every mod, keyed by enabled path.
+
+    The cache is filled from scan results or one ``scandir`` per folder via
+    :meth:`ensure_scanned`, so looking up a mod costs no I/O; a path absent
+    from a scanned folder is missing. Paths in other folders are stat'ed once
+    and remembered. Callers keep it current by reporting their own renames and
+    deletions, and by refilling the folders a watcher reported.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # normalized enabled path -> ModStatus
+        self._scanned_dirs = set()  # normalized folders whose entries are complete
+
+    def fill(self, scanned, missing_paths=(), directories=None):
+        """Store the state of ``scanned`` mods and mark ``missing_paths`` as missing.
+
+        Args:
+            directories: The folders that were scanned; only their entries are
+                replaced. None means the whole library was scanned.
+        """
+        with self._lock:
+            if directories is None:
+                self._entries = {}
+                self._scanned_dirs = set()
+            else:
+                dirs = {os.path.normcase(os.path.abspath(d)) for d in directories}
+                self._entries = {key: status for key, status in self._entries.items()
+                                 if os.path.dirname(key) not in dirs}
+                self._scanned_dirs.update(dirs)
+            for mod in scanned:
+                state = STATUS_DISABLED if mod.disabled else STATUS_ENABLED
+                key = normalize_path(mod.path)
+                self._entries[key] = ModStatus(state, mod.size, mod.mtime_ns)
+                if directories is None:
+                    self._scanned_dirs.add(os.path.dirname(key))
+            for path in missing_paths:
+                self._entries[normalize_path(path)] = ModStatus(STATUS_MISSING)
+
+    def ensure_scanned(self, directories):
+        """List each of ``directories`` not yet known with a single ``scandir``."""
+        with self._lock:
+            pending = {os.path.normcase(os.path.abspath(d)) for d in directories} - self._scanned_dirs
+        if not pending:
+            return
+        scanned = []
+        for directory in pending:
+            scanned.extend(_scan_dir(directory, None, None, False)[0])
+        self.fill(scanned, directories=pending)
+
+    def status(self, path):
+        """Return the ModStatus of the mod at ``path`` (enabled or disabled form)."""
+        key = normalize_path(path)
+        with self._lock:
+            status = self._entries.get(key)
+            if status is None and os.path.dirname(key) in self._scanned_dirs:
+                return ModStatus(STATUS_MISSING)
+        if status is None:
+            status = self._stat(path)
+            with self._lock:
+                self._entries[key] = status
+        return status
+
+    @staticmethod
+    def _stat(path):
+        enabled_path = path.replace(DISABLED_EXT, '')
+        for candidate, state in ((enabled_path, STATUS_ENABLED),
+                                 (enabled_path + DISABLED_EXT, STATUS_DISABLED)):
+            try:
+                st = os.stat(candidate)
+            except OSError:
+                continue
+            return ModStatus(state, st.st_size, st.st_mtime_ns)
+        return ModStatus(STATUS_MISSING)
+
+    def set_state(self, path, state):
+        """Record a state change made by the application itself."""
+        key = normalize_path(path)
+        with self._lock:
+            status = self._entries.get(key)
+            if status is None:
+                self._entries[key] = ModStatus(state)
+            else:
+                status.state = state
+
+    def invalidate(self, path):
+        """Forget ``path`` so the next lookup reads it from disk."""
+        key = normalize_path(path)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._scanned_dirs.discard(os.path.dirname(key))
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+In-memory search index over the mod catalog.
+
+Every record is reduced once to a lowercase search text built from its name,
+note, categories and file name. The index maps each trigram (and, for one-
+character queries, each character) of that text to the ids of the records
+containing it; two-character queries use the trigrams starting with them. So
+a query intersects a few posting sets and only checks the surviving
+candidates with a substring test instead of scanning the whole catalog.
+
+Names and categories containing Chinese characters are also indexed under
+their full pinyin and pinyin initials ("丽芙" as "lifu" and "lf"), computed
+when a record is indexed. Each character is transliterated once and cached,
+since transliterating whole names would dominate the cost of building the
+index. This needs the optional ``pypinyin`` package; without it only the
+characters themselves are indexed.
+
+A query is split on whitespace and every term must match as a substring.
+A term of three or more characters that no record contains is matched
+instead as a fuzzy subsequence within one name or category field ("lyfsk"
+finds "Lyfe skin"); notes and file names are left out of fuzzy matching,
+where short terms would match almost anything. Matches are ranked: name
+prefixes first, then other name matches, then matches in other fields, then
+fuzzy matches.
+"""
+
+import os
+import re
+
+try:
+    from pypinyin import Style, lazy_pinyin
+except ImportError:  # Optional dependency
+    lazy_pinyin = None
+
+_TERM_SPLIT = re.compile(r"\s+")
+_HAN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+FUZZY_MIN_LENGTH = 3  # Shorter terms only match as substrings
+
+# Rank of a term match; lower ranks sort first.
+RANK_NAME_PREFIX = 0
+RANK_NAME = 1
+RANK_OTHER = 2
+RANK_FUZZY = 3
+
+_pinyin_cache = {}  # hanzi -> its pinyin syllable
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def pinyin_forms(text):
+    """Return ``(full, initials)`` pinyin of ``text``, or ``()`` if there is nothing to add.
+
+    Characters other than hanzi are kept as they are. Characters are read one
+    at a time, so polyphonic ones always get their most common reading.
+    """
+    if lazy_pinyin is None or not text or not _HAN.search(text):
+        return ()
+    full, initials = [], []
+    for char in text.casefold():
+        if _HAN.match(char):
+            syllable = _pinyin_cache.get(char)
+            if syllable is None:
+                syllable = _pinyin_cache[char] = lazy_pinyin(char, style=Style.NORMAL)[0]
+            full.append(syllable)
+            initials.append(syllable[:1])
+        else:
+            full.append(char)
+            initials.append(char)
+    return "".join(full), "".join(initials)
+
+
+def _fuzzy_pattern(term):
+    # Each gap stops at the next wanted character and never crosses a field,
+    # so matching takes linear time per start position.
+    parts = [re.escape(term[0])]
+    for char in term[1:]:
+        char = re.escape(char)
+        parts.append(f"[^\n{char}]*{char}")
+    return re.compile("".join(parts))
+
+
+class SearchIndex:
+    """Trigram index from search text to record ids; not thread-safe."""
+
+    def __init__(self, categories_of=None):
+        # Records without category fields are shown under default names, and
+        # must be found under those names too.
+        self.categories_of = categories_of or (lambda r: (r.get("category1"), r.get("category2")))
+        self._texts = {}  # record id -> search text
+        self._name_lengths = {}  # record id -> length of the name part at the start of its text
+        self._fuzzy_lengths = {}  # record id -> length of the name and category parts that start its text
+        self._categories = {}  # record id -> (category1, category2)
+        self._trigrams = {}  # trigram -> set of record ids
+        self._trigram_keys = {}  # bigram -> set of the indexed trigrams starting with it
+        self._chars = {}  # character -> set of record ids
+        self._fuzzy_chars = {}  # character of a name or category field -> set of record ids
+        self._category_texts = {}  # category name -> its search text; categories repeat a lot
+
+    @staticmethod
+    def normalize(text):
+        return (text or "").casefold()
+
+    def _field_text(self, text):
+        """Return ``text`` and its pinyin forms, one per line."""
+        return "\n".join((self.normalize(text),) + pinyin_forms(text))
+
+    def _search_parts(self, record):
+        """Return ``(name part length, fuzzy part length, search text)``.
+
+        The text starts with the name, then the categories; only those parts
+        are matched fuzzily.
+        """
+        name_part = self._field_text(record.get("name"))
+        parts = [name_part]
+        for category in self.categories_of(record):
+            if category:
+                text = self._category_texts.get(category)
+                if text is None:
+                    text = self._category_texts[category] = self._field_text(category)
+                parts.append(text)
+        fuzzy_part = "\n".join(part for part in parts if part)
+        parts = [fuzzy_part, self.normalize(record.get("note")),
+                 self.normalize(os.path.basename(record.get("path", "")))]
+        # Newlines keep trigrams and fuzzy matches from spanning two fields.
+        return len(name_part), len(fuzzy_part), "\n".join(part for part in parts if part)
+
+    def search_text(self, record):
+        """Return the text a record is matched against; it starts with the name part."""
+        return self._search_parts(record)[2]
+
+    # --- Maintenance ---
+    @staticmethod
+    def _keys(text, fuzzy_length):
+        # The trailing newline gives the text's last two characters a trigram.
+        return _trigrams(text + "\n"), set(text), set(text[:fuzzy_length])
+
+    def build(self, records):
+        self._texts, self._name_lengths, self._fuzzy_lengths, self._categories = {}, {}, {}, {}
+        self._trigrams, self._trigram_keys, self._chars, self._fuzzy_chars = {}, {}, {}, {}
+        for record in records:
+            self.add(record)
+
+    def add(self, record):
+        record_id = record["id"]
+        if record_id in self._texts:
+            self.remove(record_id)
+        name_length, fuzzy_length, text = self._search_parts(record)
+        self._texts[record_id] = text
+        self._name_lengths[record_id] = name_length
+        self._fuzzy_lengths[record_id] = fuzzy_length
+        self._categories[record_id] = self.categories_of(record)
+        trigrams, chars, fuzzy_chars = self._keys(text, fuzzy_length)
+        for key in trigrams:
+            ids = self._trigrams.get(key)
+            if ids is None:
+                self._trigrams[key] = {record_id}
+                self._trigram_keys.setdefault(key[:2], set()).add(key)
+            else:
+                ids.add(record_id)
+        for postings, keys in ((self._chars, chars), (self._fuzzy_chars, fuzzy_chars)):
+            for key in keys:
+                ids = postings.get(key)
+                if ids is None:
+                    postings[key] = {record_id}
+                else:
+                    ids.add(record_id)
+
+    def update(self, record):
+        self.add(record)
+
+    def remove(self, record_id):
+        text = self._texts.pop(record_id, None)
+        self._name_lengths.pop(record_id, None)
+        fuzzy_length = self._fuzzy_lengths.pop(record_id, None)
+        self._categories.pop(record_id, None)
+        if text is None:
+            return
+        trigrams, chars, fuzzy_chars = self._keys(text, fuzzy_length)
+        for postings, keys in ((self._trigrams, trigrams), (self._chars, chars),
+                               (self._fuzzy_chars, fuzzy_chars)):
+            for key in keys:
+                ids = postings.get(key)
+                if ids is not None:
+                    ids.discard(record_id)
+                    if not ids:
+                        del postings[key]
+        for key in trigrams:
+            if key not in self._trigrams:
+                keys = self._trigram_keys.get(key[:2])
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._trigram_keys[key[:2]]
+
+    # --- Queries ---
+    def _candidates(self, term, fuzzy=False):
+        """Return the ids whose text may contain ``term``.
+
+        With ``fuzzy``, return those whose name and category fields contain
+        every character of ``term`` instead.
+        """
+        if fuzzy:
+            keys, postings = set(term), self._fuzzy_chars
+        elif len(term) < 2:
+            keys, postings = set(term), self._chars
+        elif len(term) == 2:
+            return set().union(*(self._trigrams[key] for key in self._trigram_keys.get(term, ())))
+        else:
+            keys, postings = _trigrams(term), self._trigrams
+        sets = []
+        for key in keys:
+            ids = postings.get(key)
+            if not ids:
+                return set()
+            sets.append(ids)
+        sets.sort(key=len)
+        return set(sets[0]).intersection(*sets[1:])
+
+    def _rank(self, record_id, term):
+        """Return the rank of ``term`` as a substring of a record's text, or None."""
+        text = self._texts[record_id]
+        position = text.find(term)
+        if position < 0:
+            return None
+        if position < self._name_lengths[record_id]:
+            return RANK_NAME_PREFIX if position == 0 or text[position - 1] == "\n" else RANK_NAME
+        return RANK_OTHER
+
+    def _fuzzy_rank(self, record_id, term, pattern):
+        """Return the rank of ``term`` as a subsequence of a name or category field, or None."""
+        match = pattern.search(self._texts[record_id], 0, self._fuzzy_lengths[record_id])
+        if match is None:
+            return None
+        # Tighter matches rank higher, staying below every substring match.
+        span = match.end() - match.start()
+        return RANK_FUZZY + (span - len(term)) / span
+
+    def search(self, query):
+        """Return ``{record id: rank}`` for the records matching every term of ``query``.
+
+        Lower ranks are better matches. Returns None for an empty query,
+        meaning "no filter".
+        """
+        terms = [term for term in _TERM_SPLIT.split(self.normalize(query)) if term]
+        if not terms:
+            return None
+        # The longest term usually has the smallest candidate set.
+        terms.sort(key=len, reverse=True)
+        matches = None
+        for term in terms:
+            candidates = self._candidates(term) if matches is None else matches
+            ranked = {}
+            for record_id in candidates:
+                rank = self._rank(record_id, term)
+                if rank is not None:
+                    ranked[record_id] = rank
+            if not ranked and len(term) >= FUZZY_MIN_LENGTH:
+                # Nothing contains the term, so look for it as an abbreviation.
+                pattern = _fuzzy_pattern(term)
+                for record_id in self._candidates(term, fuzzy=True) if matches is None else matches:
+                    rank = self._fuzzy_rank(record_id, term, pattern)
+                    if rank is not None:
+                        ranked[record_id] = rank
+            if matches is not None:
+                ranked = {record_id: rank + matches[record_id] for record_id, rank in ranked.items()}
+            matches = ranked
+            if not matches:
+                break
+        return matches
+
+    def categories(self, record_ids):
+        """Return the ``(category1, category2)`` pairs that hold ``record_ids``."""
+        return {self._categories[record_id] for record_id in record_ids if record_id in self._categories}
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Preview image thumbnails for the details panel.
+
+Preview screenshots are often full-resolution PNGs, far larger than the
+panel that shows them. Each image is decoded once per thumbnail size, written
+to a disk cache keyed by the image's content hash, and afterwards loaded from
+there. Decoded pixmaps are also kept in QPixmapCache, whose byte budget is
+shared by the whole application and evicts the least recently used entries.
+
+:meth:`ThumbnailCache.load_image` only uses QImage and is meant to run on a
+worker thread. It also returns the image's cache key, which takes a stat
+call and possibly a hash; :meth:`ThumbnailCache.insert` remembers the key, so
+:meth:`ThumbnailCache.cached_pixmap` on the GUI thread is a memory lookup
+without any I/O. Both handle QPixmaps and must run on the GUI thread.
+"""
+
+import os
+
+from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtGui import QImage, QImageReader, QPixmap, QPixmapCache
+
+THUMBNAIL_SIZES = (256, 512, 1024)  # Longest side, in pixels
+THUMBNAIL_FORMAT = "png"  # Keeps transparency
+PIXMAP_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def thumbnail_size_for(size):
+    """Return the smallest thumbnail size that covers a ``QSize`` display area."""
+    longest = max(size.width(), size.height())
+    for thumbnail_size in THUMBNAIL_SIZES:
+        if thumbnail_size >= longest:
+            return thumbnail_size
+    return THUMBNAIL_SIZES[-1]
+
+
+class ThumbnailCache:
+    """Disk and memory cache of downscaled preview images.
+
+    Args:
+        thumbnail_dir: Folder for the cached files, named ``<hash>_<size>.png``.
+        hash_cache: HashCache used to key thumbnails by image content, so a
+            replaced image never shows a stale thumbnail.
+        budget_bytes: Size limit of the in-memory QPixmapCache.
+    """
+
+    def __init__(self, thumbnail_dir, hash_cache, budget_bytes=PIXMAP_CACHE_BYTES):
+        self.thumbnail_dir = thumbnail_dir
+        self.hash_cache = hash_cache
+        self._keys = {}  # (image path, thumbnail size) -> cache key; GUI thread only
+        os.makedirs(thumbnail_dir, exist_ok=True)
+        QPixmapCache.setCacheLimit(budget_bytes // 1024)
+
+    def _key(self, image_path, thumbnail_size):
+        """Return ``(cache key, thumbnail path)``.
+
+        Raises:
+            OSError: The image could not be read.
+        """
+        digest = self.hash_cache.digest(image_path)
+        name = f"{digest}_{thumbnail_size}"
+        return name, os.path.join(self.thumbnail_dir, f"{name}.{THUMBNAIL_FORMAT}")
+
+    def load_image(self, image_path, thumbnail_size):
+        """Return ``(cache key, thumbnail)`` of ``image_path``, creating the thumbnail if needed.
+
+        Returns ``("", null QImage)`` if the image is missing, or a null
+        QImage if it cannot be decoded.
+        """
+        try:
+            key, thumbnail_path = self._key(image_path, thumbnail_size)
+        except OSError:
+            return "", QImage()
+        image = QImage(thumbnail_path)
+        if not image.isNull():
+            return key, image
+        reader = QImageReader(image_path)
+        reader.setAutoTransform(True)
+        source_size = reader.size()
+        if source_size.isValid():
+            # Decode straight at thumbnail resolution instead of full size.
+            target = source_size.scaled(QSize(thumbnail_size, thumbnail_size), Qt.KeepAspectRatio)
+            if target.width() < source_size.width():
+                reader.setScaledSize(target)
+        image = reader.read()
+        if image.isNull():
+            return key, image
+        # Written under a temporary name so a concurrent reader never sees half a file.
+        tmp_path = f"{thumbnail_path}.{os.getpid()}.tmp"
+        if image.save(tmp_path, THUMBNAIL_FORMAT.upper()):
+            try:
+                os.replace(tmp_path, thumbnail_path)
+            except OSError:
+                pass
+        return key, image
+
+    def cached_pixmap(self, image_path, thumbnail_size):
+        """Return the pixmap from memory, or None; does no I/O."""
+        key = self._keys.get((image_path, thumbnail_size))
+        if key is None:
+            return None
+        pixmap = QPixmapCache.find(key)
+        return pixmap if pixmap is not None and not pixmap.isNull() else None
+
+    def insert(self, image_path, thumbnail_size, key, image):
+        """Convert a thumbnail from :meth:`load_image` to a pixmap and keep it in memory."""
+        pixmap = QPixmap.fromImage(image)
+        self._keys[(image_path, thumbnail_size)] = key
+        QPixmapCache.insert(key, pixmap)
+        return pixmap
+
+    def forget(self, image_path):
+        """Drop the remembered keys of an image whose file was replaced."""
+        for thumbnail_size in THUMBNAIL_SIZES:
+            self._keys.pop((image_path, thumbnail_size), None)
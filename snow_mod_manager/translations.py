@@ -13,21 +13,36 @@ TRANSLATIONS = {
         "select_image_title": "选择图片",
         "select_mod_file_title": "选择 Mod 文件",
         "select_folder_title": "选择存放路径",
+        "select_import_folder_title": "选择要导入的 Mod 文件夹",
+        "duplicates_dialog_title": "重复的 Mod",
+        "select_archive_title": "选择 Mod 压缩包",
+        "archive_dialog_title": "选择要导入的文件",
+        "archive_dialog_desc": "勾选要导入的文件 (同名的 .pak / .utoc / .ucas 会作为一个 Mod 导入):",
         
         # Labels and Placeholders
         "mod_storage_path": "Mod 存放路径:",
         "primary_category": "一级分类 (角色名):",
         "secondary_category": "二级分类 (角色皮肤):",
+        "infer_categories_from_folders": "按文件夹结构推断分类 (一级/二级文件夹)",
         "mod_tree_header": "Mod 分类",
         "tree_uncategorized": "未分类",
         "tree_default": "默认",
         "enable_mod": "启用 Mod",
         "no_image": "无图片",
         "original_file": "原始文件:",
+        "import_mode": "导入方式:",
+        "import_mode_copy": "复制",
+        "import_mode_move": "移动",
+        "import_mode_hardlink": "硬链接",
+        "import_mode_reflink": "写时复制克隆",
         
         # Buttons
         "button_browse": "更改...",
         "button_add_mod": "添加新 Mod...",
+        "button_import_folder": "导入文件夹...",
+        "button_find_duplicates": "查找重复 Mod...",
+        "button_rescan_library": "重新扫描库",
+        "button_import_archive": "从压缩包导入...",
         "button_delete_mod": "删除选中 Mod",
         "button_toggle_theme": "切换主题",
         "button_about": "关于",
@@ -38,6 +53,7 @@ TRANSLATIONS = {
         "button_yes": "是",
         "button_no": "否",
         "button_check_update": "检查更新或反馈",
+        "button_cancel_import": "取消导入",
         
         # Messages - Informational
         "message_path_updated": "路径已更新",
@@ -47,10 +63,56 @@ TRANSLATIONS = {
         "message_app_info": "Snowbreak Mod 管理器",
         "message_version": "版本: {version}",
         "message_author": "作者: {author}",
+        "message_import_title": "导入",
+        "message_no_mods_found": "所选文件夹中没有找到 .pak / .utoc / .ucas 文件。",
+        "message_duplicates_skipped": "以下 Mod 与库中已有的 Mod 内容相同，已跳过:\n{list}",
+        "duplicate_entry": "{name} (与 {existing} 相同)",
+        "duplicates_summary": "找到 {count} 组内容相同的 Mod，共浪费 {wasted:.1f} MB。",
+        "duplicates_none": "没有找到重复的 Mod。",
+        "duplicates_group": "第 {index} 组 ({size:.1f} MB)",
+        "library_scan_title": "同步 Mod 库",
+        "library_scan_summary": "存储路径与 Mod 列表不一致：新增 {added} 个，丢失 {missing} 个，移动 {moved} 个。\n是否更新 Mod 列表？",
+        "library_scan_added": "磁盘上的新 Mod ({count})",
+        "library_scan_missing": "文件已丢失 ({count})",
+        "library_scan_moved": "已移动或重命名 ({count})",
+        "library_scan_clean": "Mod 列表与存储路径一致。",
+        "status_missing": "Mod 文件已丢失",
+        "conflict_tooltip": "与其他已启用的 Mod 覆盖了 {count} 个相同的资源",
+        "conflict_header": "与以下已启用的 Mod 冲突:",
+        "conflict_entry": "{name} ({count} 个资源)",
+        "conflict_more": "... 以及另外 {count} 个 Mod",
+        "menu_enable_selected": "启用所选 Mod",
+        "menu_disable_selected": "禁用所选 Mod",
+        "menu_enable_category": "启用此分类中的全部 Mod",
+        "menu_disable_category": "禁用此分类中的全部 Mod",
+        "profile_label": "配置方案:",
+        "button_apply_profile": "应用",
+        "button_save_profile": "保存方案...",
+        "button_delete_profile": "删除方案",
+        "profile_name_prompt": "方案名称 (保存当前已启用的 Mod):",
+        "profile_overwrite": "方案 '{name}' 已存在，是否覆盖？",
+        "profile_delete_confirm": "确定要删除方案 '{name}' 吗？",
+        "profile_applied_title": "方案已应用",
+        "profile_applied": "已切换 {mods} 个 Mod，重命名 {files} 个文件，用时 {seconds:.2f} 秒。",
+        "button_undo": "撤销",
+        "image_loading": "正在加载图片...",
+        "search_placeholder": "搜索名称、备注或分类...",
+        "undo_toggle": "撤销启用/禁用: {name}",
+        "undo_batch": "撤销批量启用/禁用 ({count} 个 Mod)",
+        "undo_delete": "撤销删除: {name}",
+        "undo_load_order": "撤销调整加载顺序 ({count} 个 Mod)",
+        "button_load_order": "加载顺序...",
+        "load_order_title": "调整加载顺序",
+        "load_order_all": "全部 Mod",
+        "load_order_hint": "拖动 Mod 调整顺序，列表中越靠下的 Mod 越晚加载，与其他 Mod 冲突时优先生效。",
+        "rename_recovery_title": "恢复未完成的操作",
+        "rename_recovery_desc": "上次退出时有一个启用/禁用或删除操作未完成。\n\n选择“是”撤销已完成的部分，选择“否”继续完成该操作。",
+        "import_progress": "正在导入 {count} 个文件: {done:.1f} / {total:.1f} MB ({speed:.1f} MB/s)",
         
         # Messages - Warnings
         "warning_title": "警告",
         "warning_select_mod": "请选择一个要删除的 Mod 项目。",
+        "warning_rename_busy": "正在重命名 Mod 文件，请等待完成后重试。",
         "warning_select_before_image": "请先选择一个 Mod。",
         "warning_invalid_category": "分类无效",
         "warning_invalid_category_desc": "必须提供一级和二级分类。",
@@ -66,14 +128,16 @@ TRANSLATIONS = {
         "error_copy_image_desc": "无法复制图片: {error}",
         "error_delete_file": "删除文件失败: {error}",
         "error_rename_file": "重命名文件时出错: {error}",
+        "error_read_archive": "无法读取压缩包: {error}",
         
         # Messages - Confirmation
         "confirm_delete": "确认删除",
-        "confirm_delete_desc": "确定要永久删除 Mod '{name}' 吗？\n这将从磁盘删除文件，此操作不可撤销。",
+        "confirm_delete_desc": "确定要删除 Mod '{name}' 吗？\n文件将移入回收区，可通过“撤销”恢复。",
         
         # File filters
         "file_filter_all": "所有文件 (*)",
         "file_filter_images": "图片文件 (*.png *.jpg *.jpeg)",
+        "file_filter_archives": "压缩包 ({patterns})",
         
         # Status/Info
         "language": "语言",
@@ -105,21 +169,36 @@ TRANSLATIONS = {
         "select_image_title": "Select Image",
         "select_mod_file_title": "Select Mod File",
         "select_folder_title": "Select Storage Path",
+        "select_import_folder_title": "Select Mod Folder to Import",
+        "duplicates_dialog_title": "Duplicate Mods",
+        "select_archive_title": "Select Mod Archive",
+        "archive_dialog_title": "Select Files to Import",
+        "archive_dialog_desc": "Check the files to import (.pak / .utoc / .ucas with the same name become one Mod):",
         
         # Labels and Placeholders
         "mod_storage_path": "Mod Storage Path:",
         "primary_category": "Primary Category (Character Name):",
         "secondary_category": "Secondary Category (Character Skin):",
+        "infer_categories_from_folders": "Infer categories from folder structure (primary/secondary folders)",
         "mod_tree_header": "Mod Categories",
         "tree_uncategorized": "Uncategorized",
         "tree_default": "Default",
         "enable_mod": "Enable Mod",
         "no_image": "No Image",
         "original_file": "Original File:",
+        "import_mode": "Import Mode:",
+        "import_mode_copy": "Copy",
+        "import_mode_move": "Move",
+        "import_mode_hardlink": "Hard Link",
+        "import_mode_reflink": "Clone (Copy-on-Write)",
         
         # Buttons
         "button_browse": "Browse...",
         "button_add_mod": "Add New Mod...",
+        "button_import_folder": "Import Folder...",
+        "button_find_duplicates": "Find Duplicates...",
+        "button_rescan_library": "Rescan Library",
+        "button_import_archive": "Import from Archive...",
         "button_delete_mod": "Delete Selected Mod",
         "button_toggle_theme": "Toggle Theme",
         "button_about": "About",
@@ -130,6 +209,7 @@ TRANSLATIONS = {
         "button_yes": "Yes",
         "button_no": "No",
         "button_check_update": "Check for Updates or Feedback",
+        "button_cancel_import": "Cancel Import",
         
         # Messages - Informational
         "message_path_updated": "Path Updated",
@@ -139,10 +219,56 @@ TRANSLATIONS = {
         "message_app_info": "Snowbreak Mod Manager",
         "message_version": "Version: {version}",
         "message_author": "Author: {author}",
+        "message_import_title": "Import",
+        "message_no_mods_found": "No .pak / .utoc / .ucas files were found in the selected folder.",
+        "message_duplicates_skipped": "These Mods have the same content as Mods already in the library and were skipped:\n{list}",
+        "duplicate_entry": "{name} (same as {existing})",
+        "duplicates_summary": "Found {count} group(s) of identical Mods wasting {wasted:.1f} MB.",
+        "duplicates_none": "No duplicate Mods found.",
+        "duplicates_group": "Group {index} ({size:.1f} MB)",
+        "library_scan_title": "Sync Mod Library",
+        "library_scan_summary": "The storage path differs from the Mod list: {added} new, {missing} missing, {moved} moved.\nUpdate the Mod list?",
+        "library_scan_added": "New Mods on disk ({count})",
+        "library_scan_missing": "Files missing ({count})",
+        "library_scan_moved": "Moved or renamed ({count})",
+        "library_scan_clean": "The Mod list matches the storage path.",
+        "status_missing": "Mod file is missing",
+        "conflict_tooltip": "Overrides {count} asset(s) that another enabled Mod also overrides",
+        "conflict_header": "Conflicts with these enabled Mods:",
+        "conflict_entry": "{name} ({count} asset(s))",
+        "conflict_more": "... and {count} more Mod(s)",
+        "menu_enable_selected": "Enable Selected Mods",
+        "menu_disable_selected": "Disable Selected Mods",
+        "menu_enable_category": "Enable All Mods in Category",
+        "menu_disable_category": "Disable All Mods in Category",
+        "profile_label": "Profile:",
+        "button_apply_profile": "Apply",
+        "button_save_profile": "Save Profile...",
+        "button_delete_profile": "Delete Profile",
+        "profile_name_prompt": "Profile name (saves the currently enabled Mods):",
+        "profile_overwrite": "Profile '{name}' already exists. Overwrite it?",
+        "profile_delete_confirm": "Are you sure you want to delete profile '{name}'?",
+        "profile_applied_title": "Profile Applied",
+        "profile_applied": "Switched {mods} Mod(s), renamed {files} file(s) in {seconds:.2f} s.",
+        "button_undo": "Undo",
+        "image_loading": "Loading image...",
+        "search_placeholder": "Search names, notes or categories...",
+        "undo_toggle": "Undo enable/disable: {name}",
+        "undo_batch": "Undo bulk enable/disable ({count} Mods)",
+        "undo_delete": "Undo delete: {name}",
+        "undo_load_order": "Undo load order change ({count} Mods)",
+        "button_load_order": "Load Order...",
+        "load_order_title": "Edit Load Order",
+        "load_order_all": "All Mods",
+        "load_order_hint": "Drag Mods to reorder them. Mods lower in the list load later and win conflicts with other Mods.",
+        "rename_recovery_title": "Recover Interrupted Operation",
+        "rename_recovery_desc": "An enable/disable or delete operation did not finish last time.\n\nChoose Yes to roll back the part that was done, or No to finish the operation.",
+        "import_progress": "Importing {count} file(s): {done:.1f} / {total:.1f} MB ({speed:.1f} MB/s)",
         
         # Messages - Warnings
         "warning_title": "Warning",
         "warning_select_mod": "Please select a Mod to delete.",
+        "warning_rename_busy": "Mod files are being renamed. Please try again when it finishes.",
         "warning_select_before_image": "Please select a Mod first.",
         "warning_invalid_category": "Invalid Category",
         "warning_invalid_category_desc": "Both primary and secondary categories are required.",
@@ -158,14 +284,16 @@ TRANSLATIONS = {
         "error_copy_image_desc": "Unable to copy image: {error}",
         "error_delete_file": "Failed to delete file: {error}",
         "error_rename_file": "Error renaming file: {error}",
+        "error_read_archive": "Unable to read archive: {error}",
         
         # Messages - Confirmation
         "confirm_delete": "Confirm Delete",
-        "confirm_delete_desc": "Are you sure you want to permanently delete Mod '{name}'?\nThis will delete the file from disk and cannot be undone.",
+        "confirm_delete_desc": "Are you sure you want to delete Mod '{name}'?\nIts files will be moved to the trash folder and can be restored with Undo.",
         
         # File filters
         "file_filter_all": "All Files (*)",
         "file_filter_images": "Image Files (*.png *.jpg *.jpeg)",
+        "file_filter_archives": "Archives ({patterns})",
         
         # Status/Info
         "language": "Language",
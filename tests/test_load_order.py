@@ -0,0 +1,50 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "snow_mod_manager"))
+
+from load_order import plan_load_order  # noqa: E402
+
+
+def _check_numbered(mods, changes):
+    renamed = {old: (new, prefix) for old, new, prefix in changes}
+    assert set(renamed) == {path for path, _ in mods}
+    new_names = []
+    for path, _ in mods:
+        new, prefix = renamed[path]
+        assert len(prefix) == 3
+        assert os.path.basename(new) == f"{prefix}_{os.path.basename(path)}"
+        new_names.append(os.path.basename(new))
+    assert new_names == sorted(new_names)
+
+
+def test_digits_the_manager_did_not_write_are_part_of_the_name():
+    mods = [("/m/2024_skin.pak", None), ("/m/zeta.pak", None), ("/m/alpha.pak", None)]
+    _check_numbered(mods, plan_load_order(mods))
+
+
+def test_unrecorded_three_digit_prefix_is_not_kept():
+    mods = [("/m/001_x.pak", None), ("/m/y.pak", None)]
+    _check_numbered(mods, plan_load_order(mods))
+
+
+def test_prefix_no_longer_in_the_name_is_ignored():
+    mods = [("/m/renamed.pak", "100"), ("/m/y.pak", None)]
+    _check_numbered(mods, plan_load_order(mods))
+
+
+def test_recorded_prefixes_are_kept():
+    mods = [("/m/100_a.pak", "100"), ("/m/b.pak", None), ("/m/300_c.pak", "300")]
+    assert plan_load_order(mods) == [("/m/b.pak", os.path.join("/m", "200_b.pak"), "200")]
+
+
+def test_growing_library_keeps_its_prefixes():
+    mods = [(f"/m/{i:03d}_mod{i}.pak", f"{i:03d}") for i in range(501)]
+    assert plan_load_order(mods) == []
+
+
+def test_moving_one_mod_renames_only_that_mod():
+    mods = [(f"/m/{i * 10:03d}_mod{i}.pak", f"{i * 10:03d}") for i in range(50)]
+    mods.insert(10, mods.pop(40))
+    changes = plan_load_order(mods)
+    assert [os.path.basename(old) for old, _, _ in changes] == ["400_mod40.pak"]